@@ -0,0 +1,110 @@
+import sys
+import json
+import itertools
+import functools
+import fire
+from process_pool import bounded_map
+from rubiks_tutor import solve
+
+# Per-process SolutionCache, opened lazily by the first chunk that needs it
+_cache = None
+
+
+def read_cubes(stream):
+    """Yield 54-char cube strings from a text stream, skipping blanks and # comments"""
+    for line in stream:
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield line
+
+
+def _get_cache(cache_path):
+    global _cache
+    if _cache is None or _cache.path != cache_path:
+        from solution_cache import SolutionCache
+        _cache = SolutionCache(cache_path)
+    return _cache
+
+
+def _solve_one(index, cube, cache=None):
+    # Errors are isolated per item so one bad scan doesn't sink the batch
+    try:
+        moves, step_names = cache.solve(cube) if cache is not None else solve(cube)
+        return {'index': index, 'cube': cube, 'moves': [str(m) for m in moves], 'steps': step_names}
+    except Exception as e:
+        return {'index': index, 'cube': cube, 'error': f"{type(e).__name__}: {e}"}
+
+
+def _solve_chunk(chunk, cache_path=None, verify=False):
+    cache = _get_cache(cache_path) if cache_path is not None else None
+    results = [_solve_one(index, cube, cache) for index, cube in chunk]
+    if verify:
+        from solution_verifier import verify_results
+        verify_results(results)
+    return results
+
+
+def _chunks(cubes, chunksize):
+    items = enumerate(cubes)
+    while True:
+        chunk = list(itertools.islice(items, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+def solve_batch(cubes, workers=None, chunksize=16, ordered=True, cache_path=None, verify=False):
+    """
+    Solve an iterable of cube strings across a process pool
+    Args:
+        cubes: Iterable of 54-char cube strings (consumed lazily)
+        workers: Number of worker processes, None for os.cpu_count(), 1 to solve in-process
+        chunksize: Number of cubes sent to a worker per task
+        ordered: Yield results in input order if True, otherwise as they complete
+        cache_path: SQLite file of a SolutionCache shared by all workers, None to always solve
+        verify: Replay each chunk's solutions with solution_verifier and add 'verified'
+    Yields:
+        One dict per cube with 'index', 'cube' and either 'moves'/'steps' or 'error'
+    """
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+
+    if workers == 1:
+        for chunk in _chunks(cubes, chunksize):
+            yield from _solve_chunk(chunk, cache_path, verify)
+        return
+
+    # Each task is a chunk, so results come back as lists
+    task = functools.partial(_solve_chunk, cache_path=cache_path, verify=verify)
+    for results in bounded_map(task, _chunks(cubes, chunksize), workers, ordered=ordered):
+        yield from results
+
+def main(input='-', output='-', workers=None, chunksize=16, ordered=True, cache=None, verify=False):
+    """
+    Solve cube strings from a file (or stdin with '-') and write one JSON result per line
+    """
+    in_stream = sys.stdin if input == '-' else open(input)
+    out_stream = sys.stdout if output == '-' else open(output, 'w')
+    failed = 0
+    unverified = 0
+    try:
+        for result in solve_batch(read_cubes(in_stream), workers=workers, chunksize=chunksize, ordered=ordered,
+                                  cache_path=cache, verify=verify):
+            if 'error' in result:
+                failed += 1
+            elif result.get('verified') is False:
+                unverified += 1
+            out_stream.write(json.dumps(result) + '\n')
+    finally:
+        if in_stream is not sys.stdin:
+            in_stream.close()
+        if out_stream is not sys.stdout:
+            out_stream.close()
+    if failed:
+        print(f"{failed} cube(s) failed to solve", file=sys.stderr)
+    if unverified:
+        print(f"{unverified} solution(s) did not solve their cube", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    fire.Fire(main)
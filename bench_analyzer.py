@@ -0,0 +1,66 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from PIL import Image
+import fire
+from cv_local_classifier import DEFAULT_REFERENCE_RGB, COLOR_NAMES
+import cv_analyze_cube
+from cv_analyze_cube import StubBackend, AnalysisCache, analyze_faces
+
+SIDE_COLORS = ['yellow', 'blue', 'red', 'green', 'orange', 'white']
+
+
+def _face_image(colors, rng, shift=0, gain=1.0):
+    # A 300x300 capture-like face: 9 stickers on black, with camera noise
+    image = np.zeros((300, 300, 3))
+    for k, color in enumerate(colors):
+        r, c = divmod(k, 3)
+        image[r * 100 + 6:r * 100 + 94, c * 100 + 6:c * 100 + 94] = DEFAULT_REFERENCE_RGB[color]
+    image = np.roll(image, shift, axis=(0, 1)) * gain + rng.normal(0, 4, image.shape)
+    return Image.fromarray(np.clip(image, 0, 255).astype(np.uint8))
+
+
+def _scan(rng, faces=None, recapture=False):
+    if faces is None:
+        faces = [[center if k == 4 else rng.choice(COLOR_NAMES) for k in range(9)] for center in SIDE_COLORS]
+    shift, gain = (int(rng.integers(-6, 7)), rng.uniform(0.93, 1.07)) if recapture else (0, 1.0)
+    return faces, [_face_image(colors, rng, shift, gain) for colors in faces]
+
+
+def main(latency=1.5, per_image=0.2, workers=3, scans=3, seed=0):
+    """
+    Time six-face analysis with the offline stub backend: one request per
+    face on the capture app's thread pool, one batched request, and a
+    batched recapture of the same faces answered by the cache
+    """
+    rng = np.random.default_rng(seed)
+    stub = StubBackend(latency, per_image)
+    cv_analyze_cube.register_backend('bench', lambda: stub)
+
+    def per_face(images):
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(lambda image: analyze_faces([image], 'bench', None)[0], images))
+
+    cache = AnalysisCache()
+    modes = {
+        f'per face ({workers} threads)': lambda images: per_face(images),
+        'batched': lambda images: analyze_faces(images, 'bench', None),
+        'batched + cache': lambda images: analyze_faces(images, 'bench', cache),
+    }
+    scans_data = [_scan(rng) for _ in range(scans)]
+    for name, analyze in modes.items():
+        requests = stub.requests
+        times = []
+        for faces, images in scans_data:
+            start = time.perf_counter()
+            analyze(images)
+            if name.endswith('cache'):
+                # A recapture of every face, e.g. after a failed validation
+                analyze(_scan(rng, faces, recapture=True)[1])
+            times.append(time.perf_counter() - start)
+        print(f"{name:24s} {np.mean(times):6.2f} s per scan, {(stub.requests - requests) / scans:.1f} requests per scan")
+    print(f"cache: {cache.hits} hits, {cache.misses} misses, {len(cache)} entries")
+
+
+if __name__ == '__main__':
+    fire.Fire(main)
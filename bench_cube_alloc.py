@@ -0,0 +1,66 @@
+"""
+Allocation and time cost of building, cloning and solving cubes, comparing
+the str -> NaiveCube -> Cubie.Cube path with deepcopy against fast_cube's
+direct parser and clone.
+
+    python bench_cube_alloc.py --n 50
+"""
+import copy
+import time
+import tracemalloc
+import fire
+from rubik_solver.Cubie import Cube
+from rubik_solver.NaiveCube import NaiveCube
+from fast_cube import parse_cube
+from benchmark import generate_corpus
+
+
+def _legacy_parse(cube_string):
+    naive = NaiveCube()
+    naive.set_cube(cube_string)
+    cube = Cube()
+    cube.from_naive_cube(naive)
+    return cube
+
+
+def _measure(fn, inputs):
+    # Time without tracing, then peak traced memory per call in a second pass
+    start = time.perf_counter()
+    for x in inputs:
+        fn(x)
+    seconds = (time.perf_counter() - start) / len(inputs)
+
+    peaks = []
+    tracemalloc.start()
+    for x in inputs:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        result = fn(x)
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+        del result
+    tracemalloc.stop()
+    return {'us_per_call': seconds * 1e6, 'peak_kib': sum(peaks) / len(peaks) / 1024}
+
+
+def main(n=50, seed=0):
+    """Print per-call time and peak allocation for each path"""
+    from rubiks_tutor import BeginnerSolverAnnotated
+    cubes = generate_corpus(n, seed)
+    legacy_cubes = [_legacy_parse(c) for c in cubes]
+    fast_cubes = [parse_cube(c) for c in cubes]
+
+    rows = [
+        ('parse', _measure(_legacy_parse, cubes), _measure(parse_cube, cubes)),
+        ('clone', _measure(copy.deepcopy, legacy_cubes), _measure(lambda c: c.clone(), fast_cubes)),
+        ('facelets', _measure(lambda c: c.to_naive_cube().get_cube(), legacy_cubes), _measure(lambda c: c.facelets(), fast_cubes)),
+        ('solve', _measure(lambda c: BeginnerSolverAnnotated(c).solution(), legacy_cubes),
+                  _measure(lambda c: BeginnerSolverAnnotated(c).solution(), fast_cubes)),
+    ]
+    print(f"{'':10}{'legacy us':>12}{'fast us':>12}{'legacy KiB':>12}{'fast KiB':>12}")
+    for name, legacy, fast in rows:
+        print(f"{name:10}{legacy['us_per_call']:12.1f}{fast['us_per_call']:12.1f}"
+              f"{legacy['peak_kib']:12.1f}{fast['peak_kib']:12.1f}")
+
+
+if __name__ == '__main__':
+    fire.Fire(main)
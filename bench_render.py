@@ -0,0 +1,62 @@
+import time
+import random
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import fire
+import cube_state
+from visualize import visualize_rubiks_cube, CubeRenderer
+
+
+def _walk(n_frames, seed):
+    # A random move walk, like stepping through a solution one move at a time
+    rng = random.Random(seed)
+    state = cube_state.solved_state()
+    frames = []
+    for _ in range(n_frames):
+        state = cube_state.apply_move(state, rng.choice(cube_state.MOVE_NAMES[:18]))
+        frames.append(cube_state.to_string(state))
+    return frames
+
+
+def _time_frames(fig, render, frames):
+    times = []
+    for cube_config in frames:
+        start = time.perf_counter()
+        render(cube_config)
+        fig.canvas.draw()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def _summary(times):
+    times = sorted(times)
+    return {
+        'mean_ms': 1000 * sum(times) / len(times),
+        'p50_ms': 1000 * times[len(times) // 2],
+        'p95_ms': 1000 * times[min(len(times) - 1, int(len(times) * 0.95))],
+    }
+
+
+def main(frames=100, seed=0):
+    """Compare per-frame time of visualize_rubiks_cube against CubeRenderer"""
+    configs = _walk(frames, seed)
+
+    fig = plt.figure(figsize=(5, 5), dpi=100)
+    ax = fig.add_subplot(111, projection='3d')
+    legacy = _summary(_time_frames(fig, lambda c: visualize_rubiks_cube(c, ax), configs))
+    plt.close(fig)
+
+    fig = plt.figure(figsize=(5, 5), dpi=100)
+    ax = fig.add_subplot(111, projection='3d')
+    renderer = CubeRenderer(ax)
+    retained = _summary(_time_frames(fig, renderer.update, configs))
+    plt.close(fig)
+
+    for name, stats in (('visualize_rubiks_cube', legacy), ('CubeRenderer', retained)):
+        print(f"{name:22s} mean {stats['mean_ms']:7.2f} ms  p50 {stats['p50_ms']:7.2f} ms  p95 {stats['p95_ms']:7.2f} ms")
+    print(f"speedup {legacy['mean_ms'] / retained['mean_ms']:.2f}x")
+
+
+if __name__ == '__main__':
+    fire.Fire(main)
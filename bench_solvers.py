@@ -0,0 +1,74 @@
+import sys
+import json
+import time
+import subprocess
+import tracemalloc
+import fire
+from rubiks_tutor import solve
+from benchmark import generate_corpus
+
+
+_LOAD_SNIPPETS = {
+    'rubik_solver CSV tables': "from rubik_solver.CoordCube import CoordCube",
+    'two_phase mmap tables': "import two_phase; t = two_phase.load_tables(); t.slice_flip_prun[0]",
+}
+
+
+def _measure_load(snippet):
+    # Fresh interpreter each time so import caches and RSS are not shared
+    # (VmHWM rather than ru_maxrss, which Linux carries over from the parent across exec)
+    code = (
+        "import time, json\n"
+        "start = time.perf_counter()\n"
+        f"{snippet}\n"
+        "elapsed = time.perf_counter() - start\n"
+        "hwm = [l for l in open('/proc/self/status') if l.startswith('VmHWM')][0].split()[1]\n"
+        "print(json.dumps({'seconds': elapsed, 'max_rss_mb': int(hwm) / 1024}))\n"
+    )
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _measure_solves(method, cubes):
+    times, lengths = [], []
+    for cube in cubes:
+        start = time.perf_counter()
+        moves, _ = solve(cube, method=method)
+        times.append(time.perf_counter() - start)
+        lengths.append(len(moves))
+    times.sort()
+
+    # Separate pass, tracemalloc slows the search down too much to time under it
+    tracemalloc.start()
+    solve(cubes[0], method=method)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        'mean_s': sum(times) / len(times),
+        'p50_s': times[len(times) // 2],
+        'max_s': times[-1],
+        'mean_moves': sum(lengths) / len(lengths),
+        'max_moves': max(lengths),
+        'peak_alloc_kb': peak / 1024,
+    }
+
+
+def main(n=10, seed=0):
+    """Compare the beginner and two-phase solvers on a seeded scramble corpus"""
+    print("Table load (fresh process)")
+    for name, snippet in _LOAD_SNIPPETS.items():
+        stats = _measure_load(snippet)
+        print(f"  {name:26s} {stats['seconds']:7.3f} s  max RSS {stats['max_rss_mb']:7.1f} MB")
+
+    cubes = generate_corpus(n, seed)
+    # Touch the tables once so the first solve doesn't pay the mmap setup
+    solve(cubes[0], method='two_phase')
+    print(f"Solves ({n} scrambles, seed {seed})")
+    for method in ('beginner', 'two_phase'):
+        stats = _measure_solves(method, cubes)
+        print(f"  {method:10s} mean {stats['mean_s']:7.3f} s  p50 {stats['p50_s']:7.3f} s  max {stats['max_s']:7.3f} s  "
+              f"moves {stats['mean_moves']:6.1f} (max {stats['max_moves']})  peak alloc {stats['peak_alloc_kb']:8.1f} KB")
+
+
+if __name__ == '__main__':
+    fire.Fire(main)
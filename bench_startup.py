@@ -0,0 +1,83 @@
+import sys
+import json
+import statistics
+import subprocess
+import fire
+
+MODULES = ['rubiks_tutor', 'batch_solve', 'visualize', 'cube_state', 'cv_input']
+
+# Runs in a fresh interpreter: time from interpreter start to the first
+# rendered cube, through Tk when a display is available and Agg otherwise
+_FIRST_FRAME = r'''
+import time, json
+start = time.perf_counter()
+cube = "wowgybwyogygybyoggrowbrgywrborwggybrbwororbwborgowryby"
+import rubiks_tutor
+imported = time.perf_counter()
+try:
+    import tkinter as tk
+    root = tk.Tk()
+    mode = "tk"
+except Exception:
+    root = None
+    mode = "agg"
+if root is not None:
+    gui = rubiks_tutor.RubiksSolverGUI(root, cube)
+    root.update()
+    root.destroy()
+else:
+    import matplotlib
+    matplotlib.use("Agg")
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from solution_timeline import SolutionTimeline
+    from visualize import CubeRenderer
+    moves, names = rubiks_tutor.solve(cube, simplify=True)
+    timeline = SolutionTimeline(cube, moves, names)
+    fig = Figure(figsize=(5, 5), dpi=100)
+    FigureCanvasAgg(fig)
+    CubeRenderer(fig.add_subplot(111, projection="3d"), timeline.cube_string(0))
+    fig.canvas.draw()
+done = time.perf_counter()
+print(json.dumps({"mode": mode, "import_s": imported - start, "first_frame_s": done - start}))
+'''
+
+
+def _import_time(module):
+    code = f"import time; s = time.perf_counter(); import {module}; print(time.perf_counter() - s)"
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+    if out.returncode != 0:
+        return None
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def main(repeat=5, json_out=None):
+    """Measure cold import time per module and time to first rendered frame"""
+    results = {'imports': {}, 'first_frame': None}
+    for module in MODULES:
+        times = [_import_time(module) for _ in range(repeat)]
+        if None in times:
+            print(f"{module:14s} failed to import")
+            continue
+        results['imports'][module] = statistics.median(times)
+        print(f"{module:14s} import {1000 * results['imports'][module]:8.1f} ms (median of {repeat})")
+
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', _FIRST_FRAME], capture_output=True, text=True, check=True)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    results['first_frame'] = {
+        'mode': runs[0]['mode'],
+        'import_s': statistics.median(r['import_s'] for r in runs),
+        'first_frame_s': statistics.median(r['first_frame_s'] for r in runs),
+    }
+    ff = results['first_frame']
+    print(f"first frame ({ff['mode']}): {1000 * ff['first_frame_s']:.1f} ms, of which rubiks_tutor import {1000 * ff['import_s']:.1f} ms")
+
+    if json_out:
+        with open(json_out, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    fire.Fire(main)
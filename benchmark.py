@@ -0,0 +1,181 @@
+"""
+Benchmark suite for the solver and renderer.
+
+    python benchmark.py corpus --n 1000 --seed 0 --out corpus.txt
+    python benchmark.py run --n 200 --seed 0 --out results.json
+    python benchmark.py compare baseline.json results.json --threshold 0.1
+
+Corpora are random face-turn scrambles generated from a seed, so two runs
+with the same seed measure the same cubes. 'compare' exits non-zero when a
+metric regressed by more than the threshold.
+"""
+import sys
+import json
+import time
+import random
+import copy
+import platform
+import fire
+import cube_state
+
+
+def generate_corpus(n, seed=0, length=25):
+    """Return n reproducible scrambled cube strings"""
+    rng = random.Random(seed)
+    cubes = []
+    for _ in range(n):
+        moves = [rng.choice(cube_state.MOVE_NAMES[:18]) for _ in range(length)]
+        cubes.append(cube_state.to_string(cube_state.apply_moves(cube_state.solved_state(), moves)))
+    return cubes
+
+
+def _percentiles(values, scale=1.0):
+    values = sorted(v * scale for v in values)
+    pick = lambda q: values[min(len(values) - 1, int(q * len(values)))]
+    return {
+        'mean': sum(values) / len(values),
+        'p50': pick(0.50),
+        'p90': pick(0.90),
+        'p99': pick(0.99),
+        'max': values[-1],
+    }
+
+
+def bench_solve(cubes):
+    from rubiks_tutor import solve
+    latencies, lengths = [], []
+    start = time.perf_counter()
+    for cube in cubes:
+        t = time.perf_counter()
+        moves, _ = solve(cube)
+        latencies.append(time.perf_counter() - t)
+        lengths.append(len(moves))
+    elapsed = time.perf_counter() - start
+    return {
+        'throughput_per_s': len(cubes) / elapsed,
+        'latency_ms': _percentiles(latencies, 1000),
+        'moves': _percentiles(lengths),
+    }
+
+
+def bench_stages(cubes):
+    from rubiks_tutor import STAGES, _check_valid_cube
+    times = {name: [] for name, _ in STAGES}
+    moves = {name: [] for name, _ in STAGES}
+    for cube in cubes:
+        cube = copy.deepcopy(_check_valid_cube(cube))
+        for name, stage_solver in STAGES:
+            t = time.perf_counter()
+            step = stage_solver(cube).solution()
+            times[name].append(time.perf_counter() - t)
+            moves[name].append(len(step))
+    return {name: {'time_ms': _percentiles(times[name], 1000), 'moves': _percentiles(moves[name])}
+            for name, _ in STAGES}
+
+
+def bench_check_valid_cube(cubes):
+    from rubiks_tutor import _check_valid_cube
+    latencies = []
+    for cube in cubes:
+        t = time.perf_counter()
+        _check_valid_cube(cube)
+        latencies.append(time.perf_counter() - t)
+    return {'latency_us': _percentiles(latencies, 1e6)}
+
+
+def bench_render(cubes, frames=50):
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from visualize import visualize_rubiks_cube, CubeRenderer
+
+    results = {}
+    configs = (cubes * (frames // len(cubes) + 1))[:frames]
+    for name in ('visualize_rubiks_cube', 'CubeRenderer'):
+        fig = Figure(figsize=(5, 5), dpi=100)
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot(111, projection='3d')
+        render = (lambda c: visualize_rubiks_cube(c, ax)) if name == 'visualize_rubiks_cube' else CubeRenderer(ax).update
+        times = []
+        for config in configs:
+            t = time.perf_counter()
+            render(config)
+            fig.canvas.draw()
+            times.append(time.perf_counter() - t)
+        results[name] = {'frame_ms': _percentiles(times, 1000)}
+    return results
+
+
+def run(n=100, seed=0, frames=50, out=None):
+    """Run every benchmark on an n-cube corpus and write JSON results"""
+    cubes = generate_corpus(n, seed)
+    results = {
+        'meta': {
+            'n': n,
+            'seed': seed,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'solve': bench_solve(cubes),
+        'stages': bench_stages(cubes),
+        'check_valid_cube': bench_check_valid_cube(cubes),
+        'render': bench_render(cubes, frames),
+    }
+    text = json.dumps(results, indent=2)
+    if out:
+        with open(out, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+def corpus(n=1000, seed=0, length=25, out=None):
+    """Write a reproducible scramble corpus, one cube string per line"""
+    lines = '\n'.join(generate_corpus(n, seed, length)) + '\n'
+    if out:
+        with open(out, 'w') as f:
+            f.write(lines)
+    else:
+        sys.stdout.write(lines)
+
+
+def _flatten(tree, prefix=''):
+    flat = {}
+    for key, value in tree.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(_flatten(value, path))
+        elif isinstance(value, (int, float)):
+            flat[path] = value
+    return flat
+
+
+def compare(baseline, current, threshold=0.1):
+    """Flag metrics that got worse than baseline by more than threshold (a fraction)"""
+    with open(baseline) as f:
+        base = _flatten({k: v for k, v in json.load(f).items() if k != 'meta'})
+    with open(current) as f:
+        new = _flatten({k: v for k, v in json.load(f).items() if k != 'meta'})
+
+    regressions = []
+    for key in sorted(base.keys() & new.keys()):
+        old_value, new_value = base[key], new[key]
+        if old_value == 0:
+            continue
+        change = (new_value - old_value) / old_value
+        # Throughput is the only higher-is-better metric
+        worse = -change if 'throughput' in key else change
+        flag = worse > threshold
+        if flag:
+            regressions.append(key)
+        print(f"{'REGRESSION' if flag else '':10s} {key:55s} {old_value:12.3f} -> {new_value:12.3f} ({change:+.1%})")
+
+    print(f"{len(regressions)} regression(s) over {threshold:.0%}")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    fire.Fire({'run': run, 'corpus': corpus, 'compare': compare})
@@ -0,0 +1,225 @@
+"""
+Whole-cube reconciliation of scanned sticker colors.
+
+Each face is classified on its own, so a single misread sticker makes the
+cube impossible. reconcile() instead looks for the most likely valid cube:
+every corner and edge slot is assigned a cubie and orientation, scored by
+the classifier's probabilities for the colors that would put there, under
+the constraints of a real cube (each cubie used once, corner twist 0 mod 3,
+even edge flip, equal corner and edge permutation parity). Fixed centers
+and 9 stickers of each color follow from those.
+
+The search is an exact dynamic program over (cubies used bitmask, twist or
+flip so far, permutation parity), once forward and once backward, so for
+every slot we also know the best valid cube with any other cubie there.
+Slots where a different cubie is nearly as likely are the ones worth a
+rescan; everything else can be corrected automatically.
+"""
+from functools import lru_cache
+import numpy as np
+import cube_state
+from cube_validation import CORNER_FACELETS, EDGE_FACELETS, CENTERS, CORNER_CUBIES, EDGE_CUBIES
+
+COLORS = cube_state.COLORS
+_FLOOR = 1e-6
+
+
+def probabilities_from_confidence(cube_string, confidence, floor=0.01):
+    """
+    Build (54, 6) color probabilities from the read colors and the
+    probability of each read; the remainder is spread over the other colors
+    Args:
+        confidence: 54 values, or a single value for every sticker
+    """
+    confidence = np.broadcast_to(np.asarray(confidence, dtype=np.float64), (54,))
+    confidence = np.clip(confidence, floor, 1 - floor)
+    probabilities = np.repeat(((1 - confidence) / (len(COLORS) - 1))[:, None], len(COLORS), axis=1)
+    probabilities[np.arange(54), cube_state.from_string(cube_string)] = confidence
+    return probabilities
+
+
+def _slot_costs(neg_log, facelets, table, face_colors):
+    # cost[slot, cubie, orientation] = -log P of the colors that cubie would show
+    n_cubies = len(facelets)
+    n_orientations = len(facelets[0])  # 3 twists per corner, 2 flips per edge
+    costs = np.zeros((n_cubies, n_cubies, n_orientations))
+    for read, (cubie, orientation) in table.items():
+        colors = face_colors[list(read)]
+        for slot, positions in enumerate(facelets):
+            costs[slot, cubie, orientation] = neg_log[list(positions), colors].sum()
+    return costs
+
+
+def _popcount(values):
+    counts = np.zeros_like(values)
+    while values.any():
+        counts += values & 1
+        values = values >> 1
+    return counts
+
+
+@lru_cache(maxsize=None)
+def _move_tables(n):
+    # [slot] -> for each cubie: the masks of `slot` used cubies that don't
+    # hold it, those masks with it added, and whether it adds an odd number
+    # of inversions (earlier slots holding larger cubies)
+    masks = np.arange(1 << n)
+    layer = _popcount(masks)
+    tables = []
+    for slot in range(n):
+        slot_moves = []
+        for cubie in range(n):
+            free = masks[((masks >> cubie) & 1 == 0) & (layer == slot)]
+            inversions = _popcount(free >> (cubie + 1)) & 1
+            slot_moves.append((cubie, free, free | (1 << cubie), inversions.astype(bool)))
+        tables.append(slot_moves)
+    return tables
+
+
+class _PieceDP:
+    """Forward/backward DP for one piece type (corners or edges)"""
+    def __init__(self, costs):
+        self.costs = costs
+        self.n, _, self.orientations = costs.shape
+        self.full = (1 << self.n) - 1
+        self.moves = _move_tables(self.n)
+        self.forward = [np.full((1 << self.n, self.orientations, 2), np.inf)]
+        self.forward[0][0, 0, 0] = 0.0
+        for slot in range(self.n):
+            self.forward.append(self._step_forward(self.forward[-1], slot))
+
+    def _step_forward(self, table, slot):
+        out = np.full_like(table, np.inf)
+        for cubie, free, added, flips in self.moves[slot]:
+            source = table[free]
+            source = np.where(flips[:, None, None], source[:, :, ::-1], source)
+            for o in range(self.orientations):
+                candidate = np.roll(source, o, axis=1) + self.costs[slot, cubie, o]
+                out[added] = np.minimum(out[added], candidate)
+        return out
+
+    def best(self):
+        """Best cost per permutation parity with total orientation 0"""
+        return self.forward[-1][self.full, 0]
+
+    def run_backward(self, terminal):
+        # backward[slot][mask, r, p]: best cost of the remaining slots plus
+        # terminal[final parity], starting from that state
+        last = np.full((1 << self.n, self.orientations, 2), np.inf)
+        last[self.full, 0] = terminal
+        self.backward = [last]
+        for slot in range(self.n - 1, -1, -1):
+            nxt = self.backward[0]
+            out = np.full_like(nxt, np.inf)
+            for cubie, free, added, flips in self.moves[slot]:
+                for o in range(self.orientations):
+                    target = np.roll(nxt[added], -o, axis=1) + self.costs[slot, cubie, o]
+                    target = np.where(flips[:, None, None], target[:, :, ::-1], target)
+                    out[free] = np.minimum(out[free], target)
+            self.backward.insert(0, out)
+
+    def marginals(self):
+        """[slot, cubie, orientation] -> best total cost with that choice"""
+        result = np.full(self.costs.shape, np.inf)
+        for slot in range(self.n):
+            before, after = self.forward[slot], self.backward[slot + 1]
+            for cubie, free, added, flips in self.moves[slot]:
+                for o in range(self.orientations):
+                    target = np.roll(after[added], -o, axis=1)
+                    target = np.where(flips[:, None, None], target[:, :, ::-1], target)
+                    result[slot, cubie, o] = (before[free] + target).min() + self.costs[slot, cubie, o]
+        return result
+
+    def decode(self):
+        """Optimal (cubie, orientation) per slot, following the backward table"""
+        mask, r, p = 0, 0, 0
+        assignment = []
+        for slot in range(self.n):
+            best = None
+            for cubie in range(self.n):
+                if mask >> cubie & 1:
+                    continue
+                flip = bin(mask >> (cubie + 1)).count('1') & 1
+                for o in range(self.orientations):
+                    state = (mask | 1 << cubie, (r + o) % self.orientations, p ^ flip)
+                    total = self.costs[slot, cubie, o] + self.backward[slot + 1][state]
+                    if best is None or total < best[0]:
+                        best = (total, cubie, o, state)
+            _, cubie, o, (mask, r, p) = best
+            assignment.append((cubie, o))
+        return assignment, p
+
+
+def _colors_for(assignment, table, facelets, face_colors, out):
+    inverse = {value: read for read, value in table.items()}
+    for slot, choice in enumerate(assignment):
+        out[list(facelets[slot])] = face_colors[list(inverse[choice])]
+
+
+def reconcile(probabilities, centers=None, rescan_ratio=20.0):
+    """
+    Find the most likely valid cube for per-sticker color probabilities
+    Args:
+        probabilities: (54, 6) array, columns in cube_state.COLORS order
+        centers: 6 center colors in ULFRBD order, default the most likely
+            color of each center sticker
+        rescan_ratio: A slot is flagged when another cubie there is at
+            least 1/rescan_ratio as likely as the chosen one
+    Returns:
+        dict with 'cube' (the valid cube string), 'corrected' (positions
+        whose color differs from the most likely read), 'rescan' (positions
+        too ambiguous to correct) and 'log_likelihood'
+    """
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    neg_log = -np.log(np.clip(probabilities, _FLOOR, 1.0))
+    if centers is None:
+        face_colors = probabilities[CENTERS].argmax(axis=1)
+    else:
+        face_colors = np.array([COLORS.index(c) for c in centers])
+    if len(set(face_colors.tolist())) != 6:
+        raise ValueError("The six centers must have different colors")
+
+    corner_dp = _PieceDP(_slot_costs(neg_log, CORNER_FACELETS, CORNER_CUBIES, face_colors))
+    edge_dp = _PieceDP(_slot_costs(neg_log, EDGE_FACELETS, EDGE_CUBIES, face_colors))
+    corner_best, edge_best = corner_dp.best(), edge_dp.best()
+    total = (corner_best + edge_best).min()
+    if not np.isfinite(total):
+        raise ValueError("No valid cube is consistent with these probabilities")
+
+    corner_dp.run_backward(edge_best)
+    corners, parity = corner_dp.decode()
+    terminal = np.full(2, np.inf)
+    terminal[parity] = corner_best[parity]
+    edge_dp.run_backward(terminal)
+    edges, _ = edge_dp.decode()
+
+    state = np.empty(54, dtype=np.uint8)
+    state[CENTERS] = face_colors
+    _colors_for(corners, CORNER_CUBIES, CORNER_FACELETS, face_colors, state)
+    _colors_for(edges, EDGE_CUBIES, EDGE_FACELETS, face_colors, state)
+
+    # Ambiguous slots: the best valid cube with a different choice there is
+    # within rescan_ratio of the best one. The corner tables already end in
+    # the best edges of either parity; the edge ones are rebuilt to match
+    edge_dp.run_backward(corner_best)
+    margin = np.log(rescan_ratio)
+    rescan = set()
+    for dp, assignment, facelets, table in ((corner_dp, corners, CORNER_FACELETS, CORNER_CUBIES),
+                                            (edge_dp, edges, EDGE_FACELETS, EDGE_CUBIES)):
+        marginals = dp.marginals()
+        inverse = {value: read for read, value in table.items()}
+        for slot, choice in enumerate(assignment):
+            chosen = face_colors[list(inverse[choice])]
+            close = np.argwhere(marginals[slot] < total + margin)
+            for cubie, o in close:
+                if (cubie, o) != choice:
+                    other = face_colors[list(inverse[(cubie, o)])]
+                    rescan.update(p for p, a, b in zip(facelets[slot], chosen, other) if a != b)
+
+    read = probabilities.argmax(axis=1)
+    return {
+        'cube': cube_state.to_string(state),
+        'corrected': np.nonzero(state != read)[0].tolist(),
+        'rescan': sorted(rescan),
+        'log_likelihood': -float(total),
+    }
@@ -0,0 +1,116 @@
+"""
+Array-backed cube state: 54 uint8 facelets in the NaiveCube 'ULFRBD' order.
+
+Each move is a precomputed permutation so that applying it is a single
+fancy-index: new_state = state[PERMS[code]]. Stacking states into an
+(N, 54) array advances N cubes at once.
+"""
+import numpy as np
+from rubik_solver.Cubie import Cube
+from rubik_solver.NaiveCube import NaiveCube
+from rubik_solver.Move import Move
+
+# Colors in the order of the NaiveCube faces U, L, F, R, B, D of a solved cube
+COLORS = 'ybrgow'
+FACES = 'ULFRBD'
+_COLOR_CODES = {c: i for i, c in enumerate(COLORS)}
+
+MOVE_NAMES = [face + suffix for face in 'UDLRFBMESXYZ' for suffix in ('', "'", '2')]
+MOVE_CODES = {name: code for code, name in enumerate(MOVE_NAMES)}
+N_MOVES = len(MOVE_NAMES)
+
+_LUT = np.full(256, 255, dtype=np.uint8)
+for _c, _i in _COLOR_CODES.items():
+    _LUT[ord(_c)] = _i
+    _LUT[ord(_c.upper())] = _i
+_COLOR_BYTES = np.frombuffer(COLORS.encode(), dtype=np.uint8)
+
+
+def _build_perms():
+    # Derive each permutation by tagging every facelet with a base-6 id spread
+    # over three probe cubes and reading back where the ids land after
+    # rubik_solver's own Cube.move, so notation semantics match exactly
+    ids = np.arange(54)
+    digits = [(ids // 6 ** k) % 6 for k in range(3)]
+    perms = np.empty((N_MOVES, 54), dtype=np.uint8)
+    for code, name in enumerate(MOVE_NAMES):
+        source = np.zeros(54, dtype=np.int64)
+        for k, digit in enumerate(digits):
+            naive = NaiveCube()
+            naive.set_cube(''.join(COLORS[d] for d in digit))
+            cube = Cube()
+            cube.from_naive_cube(naive)
+            cube.move(Move(name))
+            moved = from_string(cube.to_naive_cube().get_cube())
+            source += moved.astype(np.int64) * 6 ** k
+        perms[code] = source
+    return perms
+
+
+def from_string(cube_string):
+    """Convert a 54-char NaiveCube string into a uint8 facelet array"""
+    if len(cube_string) != 54:
+        raise ValueError("The cube configuration must be exactly 54 characters long.")
+    state = _LUT[np.frombuffer(cube_string.encode('ascii'), dtype=np.uint8)]
+    if (state == 255).any():
+        raise ValueError(f"Cube colors must be one of {', '.join(COLORS)}, got {cube_string}")
+    return state
+
+
+def to_string(state):
+    """Convert a facelet array back into the 54-char NaiveCube string"""
+    return _COLOR_BYTES[state].tobytes().decode('ascii')
+
+
+def from_strings(cube_strings):
+    """Convert a sequence of cube strings into an (N, 54) array"""
+    return np.stack([from_string(s) for s in cube_strings]) if cube_strings else np.empty((0, 54), dtype=np.uint8)
+
+
+def to_strings(states):
+    return [to_string(state) for state in states]
+
+
+def solved_state():
+    return np.repeat(np.arange(6, dtype=np.uint8), 9)
+
+
+def move_code(move):
+    """Return the permutation index for a Move or move string"""
+    return MOVE_CODES[str(move).upper()]
+
+
+def move_codes(moves):
+    return np.array([move_code(m) for m in moves], dtype=np.uint8)
+
+
+def compose(moves):
+    """Collapse a move sequence into a single facelet permutation"""
+    perm = np.arange(54, dtype=np.uint8)
+    for code in move_codes(moves):
+        perm = perm[PERMS[code]]
+    return perm
+
+
+def apply_move(state, move):
+    """Apply one move to a (54,) state or every row of an (N, 54) batch"""
+    return state[..., PERMS[move_code(move)]]
+
+
+def apply_moves(state, moves):
+    """Apply a move sequence to a (54,) state or every row of an (N, 54) batch"""
+    return state[..., compose(moves)]
+
+
+def apply_move_codes(states, codes):
+    """Apply a different move to each row of an (N, 54) batch"""
+    return np.take_along_axis(states, PERMS[codes], axis=1)
+
+
+def is_solved(state):
+    """True if every face is a single color (per row for a batch)"""
+    faces = state.reshape(state.shape[:-1] + (6, 9))
+    return (faces == faces[..., :1]).all(axis=(-1, -2))
+
+
+PERMS = _build_perms()
@@ -0,0 +1,241 @@
+"""
+Structural validation of 54-char ULFRBD cube strings.
+
+A scan can have the right colors and still be impossible to reach by
+turning: wrong color counts, repeated or nonexistent cubies, a single
+twisted corner, a single flipped edge or two swapped pieces. These are
+caught here, before any solver time is spent, with errors that point at
+facelet positions.
+
+validate() is plain Python and takes tens of microseconds per cube;
+validate_batch() checks an (N, 54) cube_state array at once.
+"""
+import numpy as np
+
+FACES = 'ULFRBD'
+COLORS = 'ybrgow'
+CENTERS = [4, 13, 22, 31, 40, 49]
+_OFFSET = {face: 9 * i for i, face in enumerate(FACES)}
+
+
+def _positions(*facelets):
+    # Kociemba style facelet names, e.g. 'U9' for the last U facelet
+    return tuple(_OFFSET[f[0]] + int(f[1]) - 1 for f in facelets)
+
+
+# Corner and edge slots in Kociemba's order; the first facelet of each is
+# the U/D one (or F/B for the middle layer edges)
+CORNER_SLOTS = ['URF', 'UFL', 'ULB', 'UBR', 'DFR', 'DLF', 'DBL', 'DRB']
+CORNER_FACELETS = [
+    _positions('U9', 'R1', 'F3'), _positions('U7', 'F1', 'L3'),
+    _positions('U1', 'L1', 'B3'), _positions('U3', 'B1', 'R3'),
+    _positions('D3', 'F9', 'R7'), _positions('D1', 'L9', 'F7'),
+    _positions('D7', 'B9', 'L7'), _positions('D9', 'R9', 'B7'),
+]
+EDGE_SLOTS = ['UR', 'UF', 'UL', 'UB', 'DR', 'DF', 'DL', 'DB', 'FR', 'FL', 'BL', 'BR']
+EDGE_FACELETS = [
+    _positions('U6', 'R2'), _positions('U8', 'F2'), _positions('U4', 'L2'), _positions('U2', 'B2'),
+    _positions('D6', 'R8'), _positions('D2', 'F8'), _positions('D4', 'L8'), _positions('D8', 'B8'),
+    _positions('F6', 'R4'), _positions('F4', 'L6'), _positions('B6', 'L4'), _positions('B4', 'R6'),
+]
+
+# Faces (indices into FACES) of each cubie, read in its slot's facelet order
+_CORNER_FACES = [tuple(FACES.index(f) for f in name) for name in CORNER_SLOTS]
+_EDGE_FACES = [tuple(FACES.index(f) for f in name) for name in EDGE_SLOTS]
+
+
+def _corner_table():
+    # faces read at a slot -> (cubie, twist); twist is where its U/D face sits
+    table = {}
+    for cubie, faces in enumerate(_CORNER_FACES):
+        for twist in range(3):
+            read = [None] * 3
+            for k in range(3):
+                read[(twist + k) % 3] = faces[k]
+            table[tuple(read)] = (cubie, twist)
+    return table
+
+
+# Faces read at a slot -> (cubie, twist) for corners, (cubie, flip) for edges
+CORNER_CUBIES = _corner_table()
+EDGE_CUBIES = {}
+for _cubie, (_a, _b) in enumerate(_EDGE_FACES):
+    EDGE_CUBIES[(_a, _b)] = (_cubie, 0)
+    EDGE_CUBIES[(_b, _a)] = (_cubie, 1)
+
+
+class CubeValidationError(ValueError):
+    """Raised by check_cube; errors holds the validate() error dicts"""
+    def __init__(self, errors):
+        self.errors = errors
+        message = errors[0]['message']
+        if len(errors) > 1:
+            message += f" (and {len(errors) - 1} more)"
+        super().__init__(message)
+
+
+def _error(check, positions, message):
+    return {'check': check, 'positions': list(positions), 'message': message}
+
+
+def facelet_name(position):
+    """Kociemba style name of a facelet index, e.g. 8 -> U9"""
+    return f"{FACES[position // 9]}{position % 9 + 1}"
+
+
+def _parity(permutation):
+    parity = 0
+    for i in range(len(permutation)):
+        for j in range(i + 1, len(permutation)):
+            parity ^= permutation[i] > permutation[j]
+    return parity
+
+
+def validate(cube_string):
+    """
+    Check that a cube string describes a reachable cube
+    Returns:
+        List of errors, empty if the cube is valid. Each error is a dict with
+        'check' (length, color, count, centers, corner, edge, twist, flip or
+        parity), 'positions' (facelet indices involved) and 'message'
+    """
+    if len(cube_string) != 54:
+        return [_error('length', [], f"The cube configuration must be exactly 54 characters long, got {len(cube_string)}")]
+    cube_string = cube_string.lower()
+    bad = [i for i, c in enumerate(cube_string) if c not in COLORS]
+    if bad:
+        return [_error('color', bad, f"Invalid color {cube_string[i]!r} at {facelet_name(i)} ({i}), must be one of {COLORS}")
+                for i in bad]
+
+    errors = []
+    for color in COLORS:
+        count = cube_string.count(color)
+        if count != 9:
+            positions = [i for i, c in enumerate(cube_string) if c == color]
+            errors.append(_error('count', positions, f"Color {color} appears {count} times, expected 9"))
+
+    face_of = {}
+    for face, position in enumerate(CENTERS):
+        color = cube_string[position]
+        if color in face_of:
+            other = CENTERS[face_of[color]]
+            errors.append(_error('centers', [other, position],
+                                 f"Centers {facelet_name(other)} and {facelet_name(position)} are both {color}"))
+        else:
+            face_of[color] = face
+    if errors:
+        return errors
+
+    corners = []
+    for slot, facelets in enumerate(CORNER_FACELETS):
+        read = tuple(face_of[cube_string[i]] for i in facelets)
+        cubie = CORNER_CUBIES.get(read)
+        if cubie is None:
+            colors = ''.join(cube_string[i] for i in facelets)
+            errors.append(_error('corner', facelets, f"Corner at {CORNER_SLOTS[slot]} ({', '.join(map(facelet_name, facelets))}) "
+                                                     f"has colors {colors}, which no corner has"))
+        corners.append(cubie)
+    edges = []
+    for slot, facelets in enumerate(EDGE_FACELETS):
+        read = tuple(face_of[cube_string[i]] for i in facelets)
+        cubie = EDGE_CUBIES.get(read)
+        if cubie is None:
+            colors = ''.join(cube_string[i] for i in facelets)
+            errors.append(_error('edge', facelets, f"Edge at {EDGE_SLOTS[slot]} ({', '.join(map(facelet_name, facelets))}) "
+                                                   f"has colors {colors}, which no edge has"))
+        edges.append(cubie)
+
+    for kind, cubies, names, all_facelets in (('corner', corners, CORNER_SLOTS, CORNER_FACELETS),
+                                              ('edge', edges, EDGE_SLOTS, EDGE_FACELETS)):
+        seen = {}
+        for slot, cubie in enumerate(cubies):
+            if cubie is not None:
+                seen.setdefault(cubie[0], []).append(slot)
+        for cubie, slots_found in seen.items():
+            if len(slots_found) > 1:
+                positions = [p for s in slots_found for p in all_facelets[s]]
+                errors.append(_error(kind, positions, f"The {names[cubie]} {kind} appears {len(slots_found)} times, "
+                                                      f"at {', '.join(names[s] for s in slots_found)}"))
+    if errors:
+        return errors
+
+    twist = sum(t for _, t in corners) % 3
+    if twist:
+        positions = [p for facelets in CORNER_FACELETS for p in facelets]
+        errors.append(_error('twist', positions, f"Corner twist adds up to {twist} (mod 3), a corner is twisted in place"))
+    flip = sum(f for _, f in edges) % 2
+    if flip:
+        positions = [p for facelets in EDGE_FACELETS for p in facelets]
+        errors.append(_error('flip', positions, "Edge flips add up to an odd number, an edge is flipped in place"))
+    if _parity([c for c, _ in corners]) != _parity([e for e, _ in edges]):
+        errors.append(_error('parity', [], "Corner and edge permutation parities differ, two pieces are swapped"))
+    return errors
+
+
+def check_cube(cube_string):
+    """Raise CubeValidationError if validate() finds any error"""
+    errors = validate(cube_string)
+    if errors:
+        raise CubeValidationError(errors)
+
+
+# Batch tables: faces read at a slot encoded as base-6 numbers
+_CORNER_CODES = np.full(6 ** 3, -1, dtype=np.int16)
+for _read, (_cubie, _twist) in CORNER_CUBIES.items():
+    _CORNER_CODES[_read[0] * 36 + _read[1] * 6 + _read[2]] = _cubie * 3 + _twist
+_EDGE_CODES = np.full(6 ** 2, -1, dtype=np.int16)
+for _read, (_cubie, _flip) in EDGE_CUBIES.items():
+    _EDGE_CODES[_read[0] * 6 + _read[1]] = _cubie * 2 + _flip
+_CORNER_INDEX = np.array(CORNER_FACELETS)
+_EDGE_INDEX = np.array(EDGE_FACELETS)
+
+CHECKS = ['count', 'centers', 'corner', 'edge', 'twist', 'flip', 'parity']
+
+
+def _batch_parity(permutations):
+    i, j = np.triu_indices(permutations.shape[1], k=1)
+    return (permutations[:, i] > permutations[:, j]).sum(axis=1) % 2
+
+
+def validate_batch(states):
+    """
+    Vectorized validate() over an (N, 54) cube_state color index array
+    Returns:
+        (N,) uint8 bitmask, bit k set when CHECKS[k] failed; 0 means valid.
+        Checks after a failed count/centers/corner/edge check are skipped
+    """
+    states = np.asarray(states, dtype=np.uint8)
+    n = len(states)
+    failed = np.zeros(n, dtype=np.uint8)
+
+    counts = (states[:, :, None] == np.arange(6, dtype=np.uint8)).sum(axis=1)
+    failed |= (counts != 9).any(axis=1).astype(np.uint8) << 0
+    centers = states[:, CENTERS]
+    distinct = (np.sort(centers, axis=1)[:, 1:] != np.sort(centers, axis=1)[:, :-1]).all(axis=1)
+    failed |= (~distinct).astype(np.uint8) << 1
+
+    # Relabel every facelet by the face whose center has its color
+    face_of = np.zeros((n, 6), dtype=np.int64)
+    np.put_along_axis(face_of, centers.astype(np.int64), np.arange(6), axis=1)
+    faces = np.take_along_axis(face_of, states.astype(np.int64), axis=1)
+
+    corner_read = faces[:, _CORNER_INDEX]
+    corners = _CORNER_CODES[corner_read[..., 0] * 36 + corner_read[..., 1] * 6 + corner_read[..., 2]]
+    edge_read = faces[:, _EDGE_INDEX]
+    edges = _EDGE_CODES[edge_read[..., 0] * 6 + edge_read[..., 1]]
+    corner_ids, edge_ids = corners // 3, edges // 2
+    bad_corners = (corners < 0).any(axis=1) | (np.sort(corner_ids, axis=1) != np.arange(8)).any(axis=1)
+    bad_edges = (edges < 0).any(axis=1) | (np.sort(edge_ids, axis=1) != np.arange(12)).any(axis=1)
+    failed |= bad_corners.astype(np.uint8) << 2
+    failed |= bad_edges.astype(np.uint8) << 3
+
+    ok = failed == 0
+    failed |= (ok & ((corners % 3).sum(axis=1) % 3 != 0)).astype(np.uint8) << 4
+    failed |= (ok & ((edges % 2).sum(axis=1) % 2 != 0)).astype(np.uint8) << 5
+    failed |= (ok & (_batch_parity(corner_ids) != _batch_parity(edge_ids))).astype(np.uint8) << 6
+    return failed
+
+
+def describe(mask):
+    """Names of the checks set in a validate_batch() mask"""
+    return [check for k, check in enumerate(CHECKS) if mask >> k & 1]
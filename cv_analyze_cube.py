@@ -1,82 +1,255 @@
 import os
+import io
+import time
 import base64
-from anthropic import Anthropic
 import json
+import itertools
+import threading
+from collections import OrderedDict
+import numpy as np
 from PIL import Image
-import io
 
 def encode_image_to_base64(image_path):
     """Convert image to base64 string"""
     with open(image_path, "rb") as image_file:
         return base64.b64encode(image_file.read()).decode('utf-8')
 
-def analyze_rubiks_cube(image_input):
-    """
-    Analyze a Rubik's cube image from a file path, PIL Image, or bytes object
-    Args:
-        image_input: Either a string path to an image file, PIL Image object, or bytes/BytesIO object
-    """
-    # Initialize Anthropic client
-    client = Anthropic(
-        api_key=os.environ.get("ANTHROPIC_API_KEY")
-    )
-    # Encode image based on input type
+def _image_base64(image_input):
+    # Encode a path, PIL Image or bytes/BytesIO object as base64 JPEG
     if isinstance(image_input, str):
         # Input is a file path
-        base64_image = encode_image_to_base64(image_input)
-    elif isinstance(image_input, Image.Image):
+        return encode_image_to_base64(image_input)
+    if isinstance(image_input, Image.Image):
         # Input is a PIL Image - convert to bytes using BytesIO
         buffered = io.BytesIO()
-        image_input.save(buffered, format="JPEG")
-        base64_image = base64.b64encode(buffered.getvalue()).decode('utf-8')
-    else:
-        # Input is already a bytes/BytesIO object
-        base64_image = base64.b64encode(image_input).decode('utf-8')
-
-    # Prepare the message with the image
-    system_prompt = "Return ONLY a valid JSON object with no additional text. The response must contain exactly six possible color values: 'white', 'yellow', 'red', 'orange', 'blue', or 'green'."
-    
-    messages = [
-        {
-            "role": "user",
-            "content": [
-                {
-                    "type": "image",
-                    "source": {
-                        "type": "base64",
-                        "media_type": "image/jpeg",
-                        "data": base64_image
-                    }
-                },
-                {
-                    "type": "text",
-                    "text": "Analyze this webcam-captured Rubik's cube image. Identify each square's color on the visible face, matching to only these allowed colors: white, yellow, red, orange, blue, green. Account for lighting variations and webcam distortion. Return a JSON with a 3x3 grid array of colors and confidence level."
+        image_input.convert('RGB').save(buffered, format="JPEG")
+        return base64.b64encode(buffered.getvalue()).decode('utf-8')
+    if isinstance(image_input, io.BytesIO):
+        image_input = image_input.getvalue()
+    # Input is already a bytes object
+    return base64.b64encode(image_input).decode('utf-8')
+
+def _as_pil(image_input):
+    if isinstance(image_input, Image.Image):
+        return image_input
+    if isinstance(image_input, (bytes, bytearray)):
+        image_input = io.BytesIO(image_input)
+    return Image.open(image_input)
+
+SYSTEM_PROMPT = "Return ONLY a valid JSON object with no additional text. The response must contain exactly six possible color values: 'white', 'yellow', 'red', 'orange', 'blue', or 'green'."
+FACE_PROMPT = "Analyze this webcam-captured Rubik's cube image. Identify each square's color on the visible face, matching to only these allowed colors: white, yellow, red, orange, blue, green. Account for lighting variations and webcam distortion. Return a JSON with a 3x3 grid array of colors and confidence level."
+FACES_PROMPT = "These are {n} webcam-captured images of Rubik's cube faces, labelled Face 1 to Face {n}. For each image, identify each square's color on the visible face, matching to only these allowed colors: white, yellow, red, orange, blue, green. Account for lighting variations and webcam distortion. Return a JSON object with a \"faces\" array holding, in image order, one object per face with a 3x3 \"grid\" array of colors and a confidence level."
+
+class AnthropicBackend:
+    """
+    Remote analysis with Claude. The client is created once, on first use
+    (anthropic is slow to import), and shared by every request and thread
+    """
+    def __init__(self, model="claude-3-5-sonnet-20241022"):
+        self.model = model
+        self._client = None
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.images = 0
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                from anthropic import Anthropic
+                self._client = Anthropic(
+                    api_key=os.environ.get("ANTHROPIC_API_KEY")
+                )
+            return self._client
+
+    def analyze(self, images):
+        """One request for all images; returns a 3x3 grid (or None) per image"""
+        content = []
+        for i, image in enumerate(images, 1):
+            if len(images) > 1:
+                content.append({"type": "text", "text": f"Face {i}:"})
+            content.append({
+                "type": "image",
+                "source": {
+                    "type": "base64",
+                    "media_type": "image/jpeg",
+                    "data": _image_base64(image)
                 }
-            ]
-        }
-    ]
-
-    # Get Claude's response
-    response = client.messages.create(
-        model="claude-3-5-sonnet-20241022",
-        max_tokens=1000,
-        system=system_prompt,
-        messages=messages
-    )
-
-    # Parse the JSON response
+            })
+        prompt = FACE_PROMPT if len(images) == 1 else FACES_PROMPT.format(n=len(images))
+        content.append({"type": "text", "text": prompt})
+
+        # Get Claude's response
+        with self._lock:
+            self.requests += 1
+            self.images += len(images)
+        response = self.client.messages.create(
+            model=self.model,
+            max_tokens=1000 + 300 * (len(images) - 1),
+            system=SYSTEM_PROMPT,
+            messages=[{"role": "user", "content": content}]
+        )
+        return _parse_grids(response.content[0].text, len(images))
+
+def _parse_grids(text, count):
+    # {"grid": ...} for a single face, {"faces": [{"grid": ...}, ...]} for several
     try:
-        result = json.loads(response.content[0].text)
-        if 'grid' in result:
-            print_cube_colors(result['grid'])
-            return result['grid']
-        else:
-            print("Error: Response doesn't contain a 'grid' field")
-            print("Full response structure:", result)
-            return None
+        result = json.loads(text)
     except json.JSONDecodeError as e:
         print(f"Error parsing JSON response: {e}")
-        return None
+        return [None] * count
+    if count == 1 and isinstance(result, dict) and 'grid' in result:
+        return [result['grid']]
+    faces = result.get('faces') if isinstance(result, dict) else None
+    if not isinstance(faces, list) or len(faces) != count:
+        print(f"Error: Response doesn't contain a 'faces' array of {count} faces")
+        print("Full response structure:", result)
+        return [None] * count
+    return [face.get('grid') if isinstance(face, dict) else face for face in faces]
+
+class StubBackend:
+    """
+    Offline stand-in for the remote model, to measure throughput and latency
+    without network access: sleeps like a round trip and answers with the
+    local sticker classifier
+    Args:
+        latency: Seconds per request
+        per_image: Extra seconds per image in the request
+    """
+    def __init__(self, latency=1.5, per_image=0.2):
+        from cv_local_classifier import StickerClassifier
+        self.latency = latency
+        self.per_image = per_image
+        self.classifier = StickerClassifier()
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.images = 0
+
+    def analyze(self, images):
+        with self._lock:
+            self.requests += 1
+            self.images += len(images)
+        time.sleep(self.latency + self.per_image * len(images))
+        with self._lock:
+            # Each request is a scan of its own, its images are the faces
+            self.classifier.reset()
+            return [self.classifier.classify(_as_pil(image), face=i)[0] for i, image in enumerate(images)]
+
+# Backend factories by name; the default comes from RUBIKS_ANALYZER_BACKEND
+BACKENDS = {
+    'anthropic': AnthropicBackend,
+    'stub': StubBackend,
+}
+_backends = {}
+_backends_lock = threading.Lock()
+
+def register_backend(name, factory):
+    """Add a backend: factory() returns an object with analyze(images) -> grids"""
+    BACKENDS[name] = factory
+
+def get_backend(name=None):
+    """Shared backend instance by name"""
+    name = name or os.environ.get("RUBIKS_ANALYZER_BACKEND", "anthropic")
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown analyzer backend {name!r}, must be one of {', '.join(BACKENDS)}")
+    with _backends_lock:
+        if name not in _backends:
+            _backends[name] = BACKENDS[name]()
+        return _backends[name]
+
+def face_signature(image_input):
+    """
+    Perceptual hash of a face: the Lab color of the center of each of its 9
+    stickers, lightness weighted down like the local classifier. Recaptures
+    of the same face land close together, changing any sticker's color does not
+    """
+    from cv_local_classifier import sample_stickers, rgb_to_lab, LAB_WEIGHTS
+    return (rgb_to_lab(sample_stickers(_as_pil(image_input))) * LAB_WEIGHTS).reshape(9, 3)
+
+class AnalysisCache:
+    """
+    LRU cache of face grids keyed by face_signature(); a lookup hits when
+    every sticker of a cached face is within tolerance (Lab distance)
+    """
+    def __init__(self, maxsize=256, tolerance=10.0):
+        self.maxsize = maxsize
+        self.tolerance = tolerance
+        self._entries = OrderedDict()  # id -> (backend name, signature, grid)
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, backend_name, signature):
+        with self._lock:
+            for key, (name, cached, grid) in reversed(self._entries.items()):
+                if name == backend_name and np.linalg.norm(cached - signature, axis=1).max() <= self.tolerance:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return grid
+            self.misses += 1
+            return None
+
+    def put(self, backend_name, signature, grid):
+        """Store a grid, replacing any entry the signature would hit"""
+        with self._lock:
+            stale = [key for key, (name, cached, _) in self._entries.items()
+                     if name == backend_name and np.linalg.norm(cached - signature, axis=1).max() <= self.tolerance]
+            for key in stale:
+                del self._entries[key]
+            self._entries[next(self._ids)] = (backend_name, signature, grid)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+DEFAULT_CACHE = AnalysisCache()
+
+def analyze_faces(images, backend=None, cache=DEFAULT_CACHE, refresh=False):
+    """
+    Analyze several face images with a single request
+    Args:
+        images: File paths, PIL Images or bytes, e.g. the six captured faces
+        backend: Backend name (see BACKENDS), None for the default
+        cache: AnalysisCache of earlier results, None to always ask the backend
+        refresh: Ask the backend even for cached faces and overwrite their
+            entries, e.g. to retry a face the cache got wrong
+    Returns:
+        A 3x3 grid of color names per image, None where analysis failed.
+        Faces found in the cache are not sent; if every face is cached no
+        request is made
+    """
+    name = backend or os.environ.get("RUBIKS_ANALYZER_BACKEND", "anthropic")
+    grids = [None] * len(images)
+    signatures = [None] * len(images)
+    missing = []
+    for i, image in enumerate(images):
+        if cache is not None:
+            signatures[i] = face_signature(image)
+            if not refresh:
+                grids[i] = cache.get(name, signatures[i])
+        if grids[i] is None:
+            missing.append(i)
+    if missing:
+        results = get_backend(name).analyze([images[i] for i in missing])
+        for i, grid in zip(missing, results):
+            grids[i] = grid
+            if cache is not None and grid is not None:
+                cache.put(name, signatures[i], grid)
+    return grids
+
+def analyze_rubiks_cube(image_input, backend=None, cache=DEFAULT_CACHE, refresh=False):
+    """
+    Analyze a Rubik's cube image from a file path, PIL Image, or bytes object
+    Args:
+        image_input: Either a string path to an image file, PIL Image object, or bytes/BytesIO object
+        refresh: Skip the cache lookup but store the new grid, see analyze_faces
+    """
+    grid = analyze_faces([image_input], backend, cache, refresh)[0]
+    if grid is not None:
+        print_cube_colors(grid)
+    return grid
 
 def print_cube_colors(colors):
     if not colors:
@@ -0,0 +1,118 @@
+"""
+Hands-free capture for the scanner's live preview.
+
+The capture splits the 300x300 preview into a 3x3 grid, so a face is ready
+when that grid lines up with the stickers: the center patch of every cell
+is a flat color and the lines between cells are darker (the cube's black
+plastic). Each check runs on a 60x60 downsample of the preview, plus a
+Laplacian on a 150x150 gray copy for blur, about a millisecond in all, so
+it runs on every preview frame within the 50 ms preview interval.
+
+A face is captured once the grid has held still for a few frames, the image
+is sharp, and the stickers don't match the previous capture (the operator
+hasn't turned the cube yet).
+"""
+import time
+import numpy as np
+import cv2
+from cv_local_classifier import rgb_to_lab, LAB_WEIGHTS
+
+_SMALL = 60
+_CELL = _SMALL // 3
+# Central patch of each cell, and the bands between cells
+_PATCH = slice(_CELL // 4, _CELL - _CELL // 4)
+_LINES = [_CELL - 1, _CELL, 2 * _CELL - 1, 2 * _CELL]
+
+
+def detect_grid(frame_bgr, max_patch_std=14.0, min_line_contrast=25.0):
+    """
+    Check whether a face fills the capture grid
+    Args:
+        frame_bgr: The 300x300 BGR preview (any square size works)
+        max_patch_std: Largest gray standard deviation inside a sticker patch
+        min_line_contrast: How much darker the lines between cells must be
+            than the darkest sticker
+    Returns:
+        (found, colors): colors is the (9, 3) Lab color of each sticker patch,
+        lightness weighted down like the classifier
+    """
+    small = cv2.resize(frame_bgr, (_SMALL, _SMALL), interpolation=cv2.INTER_AREA).astype(np.float32)
+    gray = small.mean(axis=2)
+    cells = small.reshape(3, _CELL, 3, _CELL, 3)[:, _PATCH, :, _PATCH]
+    means = cells.mean(axis=(1, 3)).reshape(9, 3)
+    stds = gray.reshape(3, _CELL, 3, _CELL)[:, _PATCH, :, _PATCH].std(axis=(1, 3))
+    colors = rgb_to_lab(means[:, ::-1]) * LAB_WEIGHTS
+
+    # Inside the face only, so a dark background doesn't count as a line
+    inner = slice(_CELL // 4, _SMALL - _CELL // 4)
+    lines = np.concatenate([gray[_LINES, inner].ravel(), gray[inner, _LINES].ravel()])
+    contrast = means.mean(axis=1).min() - np.median(lines)
+    return bool(stds.max() <= max_patch_std and contrast >= min_line_contrast), colors
+
+
+def sharpness(frame_bgr):
+    """Variance of the Laplacian of a 150x150 gray copy; low means blurry"""
+    gray = cv2.cvtColor(cv2.resize(frame_bgr, (150, 150), interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+    return float(cv2.Laplacian(gray, cv2.CV_32F).var())
+
+
+class AutoCapture:
+    """
+    Decides from preview frames when to capture the next face
+    Args:
+        stable_frames: Consecutive frames the grid must hold still
+        stable_tolerance: Largest sticker color change (Lab) between frames that counts as still
+        duplicate_tolerance: Stickers all within this of the last capture mean the same face
+        min_sharpness: Smallest sharpness() accepted
+    """
+    def __init__(self, stable_frames=5, stable_tolerance=6.0, duplicate_tolerance=12.0, min_sharpness=80.0):
+        self.stable_frames = stable_frames
+        self.stable_tolerance = stable_tolerance
+        self.duplicate_tolerance = duplicate_tolerance
+        self.min_sharpness = min_sharpness
+        self.last_capture = None
+        self.last_ms = 0.0
+        self.reset()
+
+    def reset(self):
+        """Forget the current run of stable frames (not the last capture)"""
+        self._previous = None
+        self._stable = 0
+
+    def update(self, frame_bgr):
+        """
+        Feed one preview frame
+        Returns:
+            (capture, status): capture is True when this frame should be
+            captured; status is a short text for the operator
+        """
+        start = time.perf_counter()
+        try:
+            return self._update(frame_bgr)
+        finally:
+            self.last_ms = 1000 * (time.perf_counter() - start)
+
+    def _update(self, frame_bgr):
+        found, colors = detect_grid(frame_bgr)
+        if not found:
+            self.reset()
+            return False, "align the face with the grid"
+        if self.last_capture is not None and _distance(colors, self.last_capture) <= self.duplicate_tolerance:
+            self.reset()
+            return False, "turn to the next face"
+        if self._previous is not None and _distance(colors, self._previous) <= self.stable_tolerance:
+            self._stable += 1
+        else:
+            self._stable = 1
+        self._previous = colors
+        if self._stable < self.stable_frames:
+            return False, f"hold still {self._stable}/{self.stable_frames}"
+        if sharpness(frame_bgr) < self.min_sharpness:
+            return False, "too blurry, hold still"
+        self.last_capture = colors
+        self.reset()
+        return True, "captured"
+
+
+def _distance(a, b):
+    return np.linalg.norm(a - b, axis=1).max()
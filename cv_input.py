@@ -1,32 +1,139 @@
 import cv2
+import numpy as np
+import cube_state
 import tkinter as tk
-from tkinter import ttk, Label, Canvas, Frame
+from tkinter import ttk, Label, Canvas, Frame, messagebox
 from PIL import Image, ImageTk
-from cv_analyze_cube import analyze_rubiks_cube
+from cv_analyze_cube import analyze_rubiks_cube, analyze_faces
+from cv_local_classifier import StickerClassifier, COLOR_NAMES
+from cv_autocapture import AutoCapture
+from cube_validation import validate, facelet_name
+from cube_correction import reconcile, probabilities_from_confidence
 import subprocess
 import sys
+import os
+import queue
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Center color of each side entry, in capture order
+SIDE_COLORS = ['yellow', 'blue', 'red', 'green', 'orange', 'white']
+
+# Last working camera index, so later runs can skip probing
+CAMERA_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".rubiks_tutor_camera")
+
+
+def _try_camera(index):
+    cap = cv2.VideoCapture(index)
+    ret, frame = cap.read()  # Try capturing a frame
+    if ret and frame is not None:
+        return cap
+    cap.release()  # Release the failed capture
+    return None
+
+
+def open_camera(camera_index=None):
+    """
+    Open a camera, trying in order: camera_index, $RUBIK_CAMERA_INDEX, the
+    cached index from the last run, then probing indices 0-4
+    """
+    candidates = []
+    if camera_index is not None:
+        candidates.append(int(camera_index))
+    if os.environ.get("RUBIK_CAMERA_INDEX"):
+        candidates.append(int(os.environ["RUBIK_CAMERA_INDEX"]))
+    try:
+        with open(CAMERA_CACHE_PATH) as f:
+            candidates.append(int(f.read().strip()))
+    except (OSError, ValueError):
+        pass
+    for i in candidates:
+        cap = _try_camera(i)
+        if cap is not None:
+            print(f"Using camera index {i}")
+            return cap
+
+    # Try different camera indices until we find one that works
+    for i in range(5):  # Try indices 0, 1, 2, 3, 4
+        if i in candidates:
+            continue
+        cap = _try_camera(i)
+        if cap is not None:
+            print(f"Using camera index {i}")
+            try:
+                with open(CAMERA_CACHE_PATH, 'w') as f:
+                    f.write(str(i))
+            except OSError:
+                pass
+            return cap
+
+    raise RuntimeError("No working camera found!")
+
+
+class FrameGrabber:
+    """
+    Reads the camera on its own thread and keeps only the latest frame.
+
+    Frames are read into a reused back buffer that is swapped with the
+    front buffer under a lock, so steady-state capture doesn't allocate.
+    """
+    def __init__(self, cap):
+        self.cap = cap
+        self.lock = threading.Lock()
+        self._front = None
+        self._back = None
+        self.seq = 0  # number of frames captured so far
+        self.fps = 0.0
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        window_start, window_frames = time.perf_counter(), 0
+        while self._running:
+            ret, frame = self.cap.read(self._back) if self._back is not None else self.cap.read()
+            if not ret:
+                time.sleep(0.01)
+                continue
+            with self.lock:
+                self._back, self._front = self._front, frame
+                self.seq += 1
+            window_frames += 1
+            now = time.perf_counter()
+            if now - window_start >= 1.0:
+                self.fps = window_frames / (now - window_start)
+                window_start, window_frames = now, 0
+
+    def latest(self, out=None):
+        """Copy the newest frame into out (allocated if None), returns (seq, frame) or (seq, None)"""
+        with self.lock:
+            if self._front is None:
+                return self.seq, None
+            if out is None or out.shape != self._front.shape:
+                out = np.empty_like(self._front)
+            np.copyto(out, self._front)
+            return self.seq, out
+
+    def stop(self):
+        self._running = False
+        self._thread.join(timeout=1.0)
+
 
 class CubeCaptureApp:
-    def __init__(self, root):
+    def __init__(self, root, camera_index=None, on_complete=None):
+        # on_complete(cube_string) is called instead of launching the solver
+        # in a new interpreter, see scan_and_solve.py
         self.root = root
+        self.on_complete = on_complete
+        self.closed = False
         self.root.title("Rubik's Cube Capture")
         self.root.geometry("800x600")  # Smaller window
         self.root.configure(bg="#f0f0f0")
         
-        # Try different camera indices until we find one that works
-        self.cap = None
-        for i in range(5):  # Try indices 0, 1, 2, 3, 4
-            cap = cv2.VideoCapture(i)
-            ret, frame = cap.read()  # Try capturing a frame
-            if ret and frame is not None:
-                self.cap = cap
-                print(f"Using camera index {i}")
-                break
-            else:
-                cap.release()  # Release the failed capture
-        
-        if self.cap is None:
-            raise RuntimeError("No working camera found!")
+        self.cap = open_camera(camera_index)
+        self.grabber = FrameGrabber(self.cap)
         
         self.frame = Frame(self.root, bg="#f0f0f0")
         self.frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
@@ -70,6 +177,26 @@ class CubeCaptureApp:
                            highlightthickness=2)
         self.canvas.pack()
         
+        # One persistent image item, updated in place every frame
+        self.preview_photo = ImageTk.PhotoImage('RGBA', (300, 300))
+        self.canvas.create_image(150, 150, image=self.preview_photo)
+        # Capture grid guide, the face's stickers go in these cells
+        for k in (100, 200):
+            self.canvas.create_line(k, 0, k, 300, fill="#bdc3c7", dash=(3, 3))
+            self.canvas.create_line(0, k, 300, k, fill="#bdc3c7", dash=(3, 3))
+        self._raw_frame = None
+        self._preview_bgr = np.empty((300, 300, 3), dtype=np.uint8)
+        # RGBA so PIL maps the array's memory instead of copying it
+        self._preview_rgba = np.empty((300, 300, 4), dtype=np.uint8)
+        self._preview_image = Image.frombuffer('RGBA', (300, 300), self._preview_rgba, 'raw', 'RGBA', 0, 1)
+        
+        self.fps_label = Label(camera_container,
+                             text="",
+                             font=("Arial", 8),
+                             bg="#f0f0f0",
+                             fg="#95a5a6")
+        self.fps_label.pack()
+        
         # Captured view
         captured_container = Frame(self.canvas_frame, bg="#f0f0f0")
         captured_container.grid(row=0, column=1, padx=10)
@@ -98,11 +225,44 @@ class CubeCaptureApp:
                                fg="#7f8c8d")
         self.result_text.pack(pady=5)
         
+        # Analyzer selection: local classifier with the remote model as
+        # fallback, the remote model per face, or all six faces in one request
+        # once the last one is captured
+        analyzer_frame = Frame(self.frame, bg="#f0f0f0")
+        analyzer_frame.pack(pady=2)
+        self.analyzer_var = tk.StringVar(value='local')
+        for value, text in (('local', "Local (offline)"), ('remote', "Remote (Claude)"),
+                            ('batch', "Remote, all six")):
+            tk.Radiobutton(analyzer_frame,
+                           text=text,
+                           variable=self.analyzer_var,
+                           value=value,
+                           bg="#f0f0f0",
+                           font=("Arial", 9)).pack(side=tk.LEFT, padx=5)
+        self.classifier = StickerClassifier()
+        self.local_confidence_threshold = 0.6
+        # Assumed per-sticker accuracy of the remote model and of typed colors
+        self.default_confidence = 0.9
+        self.face_reads = [None] * 6
+        self.face_probabilities = [None] * 6
+        self.captured_images = [None] * 6
+        
+        # Auto capture: take each face once the grid is found and held still
+        self.autocapture = AutoCapture()
+        self.auto_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(analyzer_frame,
+                       text="Auto capture",
+                       variable=self.auto_var,
+                       command=self.on_auto_toggle,
+                       bg="#f0f0f0",
+                       font=("Arial", 9)).pack(side=tk.LEFT, padx=5)
+        
         # Side entries in two columns
         self.sides_frame = Frame(self.frame, bg="#f0f0f0")
         self.sides_frame.pack(pady=5)
         
         self.side_entries = []
+        self.status_labels = []
         side_labels = [
             "Yellow side (orange top)",
             "Blue side (yellow top)",
@@ -137,6 +297,21 @@ class CubeCaptureApp:
             entry.pack(side=tk.LEFT)
             entry.bind('<FocusIn>', lambda e, idx=i: self.on_entry_select(idx))
             self.side_entries.append(entry)
+            
+            # Per-face analysis status with cancel/retry
+            status = Label(side_frame,
+                          text="",
+                          bg="#f0f0f0",
+                          font=("Arial", 9),
+                          fg="#7f8c8d",
+                          width=9,
+                          anchor='w')
+            status.pack(side=tk.LEFT, padx=(5, 0))
+            self.status_labels.append(status)
+            tk.Button(side_frame, text="\u2715", font=("Arial", 8), bd=0, bg="#f0f0f0",
+                      command=lambda idx=i: self.cancel_analysis(idx)).pack(side=tk.LEFT)
+            tk.Button(side_frame, text="\u21bb", font=("Arial", 8), bd=0, bg="#f0f0f0",
+                      command=lambda idx=i: self.retry_analysis(idx)).pack(side=tk.LEFT)
         
         # Highlight first entry
         self.side_entries[0].config(bg='#e8f0fe')
@@ -150,8 +325,23 @@ class CubeCaptureApp:
         
         self.root.bind("<Return>", self.capture_image)
         
+        # Analysis runs on a worker pool and reports back through a queue
+        # polled from the Tk loop, so the preview never waits on it
+        self.executor = ThreadPoolExecutor(max_workers=3)
+        self.results = queue.Queue()
+        self.jobs = {}  # entry index -> latest job for that face
+        self.job_ids = itertools.count()
+        self.classifier_lock = threading.Lock()
+        self.poll_interval = 50
+        self.poll_results()
+        
         # Reduce update frequency
         self.update_interval = 50  # 20 FPS instead of 30
+        self.last_seq = 0
+        self.shown_frames = 0
+        self.dropped_frames = 0
+        self.preview_fps = 0.0
+        self._fps_window = (time.perf_counter(), 0)
         self.update_frame()
         
         # Add solve button at the bottom (initially disabled)
@@ -162,26 +352,65 @@ class CubeCaptureApp:
             state='disabled'
         )
         self.solve_button.pack(pady=10)
+        ttk.Button(self.frame, text="New Scan", command=self.new_scan).pack()
         
         # Bind entry changes to check completion
         for entry in self.side_entries:
             entry.bind('<KeyRelease>', self.check_entries_complete)
     
     def update_frame(self):
-        ret, frame = self.cap.read()
-        if ret:
-            # Resize first to reduce processing load
-            frame = cv2.resize(frame, (300, 300))
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        if self.closed:
+            return
+        seq, frame = self.grabber.latest(self._raw_frame)
+        if frame is not None and seq != self.last_seq:
+            self._raw_frame = frame
+            # Frames the camera delivered that we never showed
+            self.dropped_frames += max(0, seq - self.last_seq - 1)
+            self.last_seq = seq
             
-            # Convert directly to PhotoImage without using PIL unless necessary
-            img_tk = ImageTk.PhotoImage(image=Image.fromarray(frame))
-            self.canvas.delete("all")
-            self.canvas.create_image(150, 150, image=img_tk)
-            self.canvas.img_tk = img_tk  # Keep reference to prevent garbage collection
+            # Resize and convert into preallocated buffers, then paste into
+            # the existing PhotoImage instead of creating a new one
+            cv2.resize(frame, (300, 300), dst=self._preview_bgr)
+            cv2.cvtColor(self._preview_bgr, cv2.COLOR_BGR2RGBA, dst=self._preview_rgba)
+            self.preview_photo.paste(self._preview_image)
+            self.shown_frames += 1
+            if self.auto_var.get():
+                self.auto_capture_step()
+        
+        start, count = self._fps_window
+        now = time.perf_counter()
+        if now - start >= 1.0:
+            self.preview_fps = (self.shown_frames - count) / (now - start)
+            self._fps_window = (now, self.shown_frames)
+            text = (f"preview {self.preview_fps:.1f} fps | camera {self.grabber.fps:.1f} fps | "
+                    f"dropped {self.dropped_frames}")
+            if self.auto_var.get():
+                text += f" | detect {self.autocapture.last_ms:.1f} ms"
+            self.fps_label.config(text=text)
         
         self.root.after(self.update_interval, self.update_frame)
     
+    def on_auto_toggle(self):
+        self.autocapture.reset()
+        self.autocapture.last_capture = None
+        if self.auto_var.get():
+            self.instruction_label.config(text="Auto capture: align the face with the grid")
+        else:
+            self.instruction_label.config(text="Align cube and press Enter to capture")
+    
+    def auto_capture_step(self):
+        # Runs on each new preview frame, on the preview buffer just drawn
+        capture, status = self.autocapture.update(self._preview_bgr)
+        index = self.selected_entry_index
+        if capture:
+            self.capture_image(frame=self._raw_frame)
+            if index == 5:
+                self.auto_var.set(False)
+                self.instruction_label.config(text="Auto capture done, all six faces captured")
+                return
+            status = f"captured face {index + 1}, turn to the next face"
+        self.instruction_label.config(text=f"Auto capture: {status}")
+    
     def on_entry_select(self, index):
         # Reset background of all entries
         for entry in self.side_entries:
@@ -190,9 +419,12 @@ class CubeCaptureApp:
         self.side_entries[index].config(bg='#e8f0fe')
         self.selected_entry_index = index
 
-    def capture_image(self, event=None):
-        ret, frame = self.cap.read()
-        if ret:
+    def capture_image(self, event=None, frame=None):
+        # The camera belongs to the grabber thread; take a copy of its latest
+        # frame unless auto capture passes the frame it checked
+        if frame is None:
+            _, frame = self.grabber.latest()
+        if frame is not None:
             # Process captured image
             frame = cv2.resize(frame, (300, 300))
             frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
@@ -206,23 +438,198 @@ class CubeCaptureApp:
             self.captured_canvas.create_image(150, 150, image=img_tk)
             self.captured_canvas.img_tk = img_tk
             
-            # Analyze the cube and display results
+            # Analyze in the background and move on to the next face right away
+            index = self.selected_entry_index
+            self.captured_images[index] = img
+            if self.analyzer_var.get() != 'batch':
+                self.submit_analysis(index, img)
+            else:
+                self.detach_job(index)
+                self.jobs[index] = {'id': None, 'image': img, 'analyzer': 'batch', 'cancelled': False, 'future': None}
+                self.set_status(index, "queued", "#7f8c8d")
+                if all(image is not None for image in self.captured_images):
+                    self.submit_batch()
+            if self.selected_entry_index < 5:
+                self.on_entry_select(self.selected_entry_index + 1)
+    
+    def submit_analysis(self, index, img, fresh=False):
+        # fresh asks the remote model again and overwrites its cached grid
+        self.detach_job(index)
+        job = {'id': next(self.job_ids), 'image': img, 'analyzer': self.analyzer_var.get(), 'cancelled': False}
+        job['future'] = self.executor.submit(self._run_analysis, job['id'], index, img, job['analyzer'], fresh)
+        self.jobs[index] = job
+        self.set_status(index, "analyzing", "#2980b9")
+    
+    def submit_batch(self):
+        # One request for every queued face, sharing a job id and future.
+        # Recaptures of faces the cache has seen are answered without a request
+        indices = [i for i, job in self.jobs.items() if job['id'] is None and not job['cancelled']]
+        if not indices:
+            return
+        images = [self.jobs[i]['image'] for i in indices]
+        job_id = next(self.job_ids)
+        future = self.executor.submit(self._run_batch, job_id, indices, images)
+        for index in indices:
+            self.jobs[index].update(id=job_id, future=future)
+            self.set_status(index, "analyzing", "#2980b9")
+    
+    def _run_batch(self, job_id, indices, images):
+        # Worker thread, like _run_analysis
+        try:
+            grids = analyze_faces(images)
+        except Exception as e:
+            grids = [e] * len(images)
+        for index, grid in zip(indices, grids):
+            if isinstance(grid, Exception):
+                self.results.put((job_id, index, None, None, None, grid))
+            elif grid is None:
+                self.results.put((job_id, index, None, None, None, ValueError("remote analysis returned no grid")))
+            else:
+                self.results.put((job_id, index, grid, None, None, None))
+    
+    def _run_analysis(self, job_id, index, img, analyzer, fresh=False):
+        # Worker thread: no Tk calls here, only the results queue
+        try:
+            grid, confidence, probabilities = self.analyze_face(img, index, analyzer, fresh)
+            self.results.put((job_id, index, grid, confidence, probabilities, None))
+        except Exception as e:
+            self.results.put((job_id, index, None, None, None, e))
+    
+    def poll_results(self):
+        if self.closed:
+            return
+        while True:
             try:
-                grid = analyze_rubiks_cube(img)
-                color_sequence = ''.join(color[0].lower() for row in grid for color in row)
+                job_id, index, grid, confidence, probabilities, error = self.results.get_nowait()
+            except queue.Empty:
+                break
+            job = self.jobs.get(index)
+            if job is None or job['id'] != job_id or job['cancelled']:
+                continue  # cancelled or superseded by a newer capture
+            if error is not None:
+                self.set_status(index, "error", "#c0392b")
+                self.result_text.config(text=f"Error analyzing cube: {error}")
+                continue
+            color_sequence = ''.join(color[0].lower() for row in grid for color in row)
+            if confidence is not None:
+                lowest = min(min(row) for row in confidence)
+                self.result_text.config(text=f"Cube colors: {color_sequence} (lowest confidence {lowest:.2f})")
+            else:
                 self.result_text.config(text=f"Cube colors: {color_sequence}")
-                
-                # Update the selected entry
-                self.side_entries[self.selected_entry_index].delete(0, tk.END)
-                self.side_entries[self.selected_entry_index].insert(0, color_sequence)
-                
-                # Move to next entry if possible
-                if self.selected_entry_index < 5:
-                    next_index = self.selected_entry_index + 1
-                    self.on_entry_select(next_index)
-                
-            except Exception as e:
-                self.result_text.config(text=f"Error analyzing cube: {e}")
+            self.side_entries[index].delete(0, tk.END)
+            self.side_entries[index].insert(0, color_sequence)
+            self.face_reads[index] = color_sequence
+            self.face_probabilities[index] = probabilities
+            self.set_status(index, "done", "#27ae60")
+            self.check_entries_complete()
+            if all(len(entry.get()) == 9 for entry in self.side_entries):
+                self.reconcile_scan()
+        self.root.after(self.poll_interval, self.poll_results)
+    
+    def detach_job(self, index):
+        # Stop wanting the face's current result. A batch future is only
+        # cancelled once none of its faces want it; queued jobs have none
+        job = self.jobs.get(index)
+        if job is None or job['cancelled']:
+            return False
+        job['cancelled'] = True
+        sharing = [j for j in self.jobs.values() if j['future'] is job['future'] and not j['cancelled']]
+        if job['future'] is not None and not sharing:
+            job['future'].cancel()
+        return True
+    
+    def cancel_analysis(self, index):
+        if self.detach_job(index):
+            self.set_status(index, "cancelled", "#7f8c8d")
+    
+    def retry_analysis(self, index):
+        # Re-analyze the face's last captured image; the cache would only
+        # return the same grid again, so it is refreshed instead
+        job = self.jobs.get(index)
+        if job is not None:
+            self.submit_analysis(index, job['image'], fresh=True)
+    
+    def set_status(self, index, text, color):
+        self.status_labels[index].config(text=text, fg=color)
+    
+    def analyze_face(self, img, index, analyzer='local', fresh=False):
+        # Returns (grid, confidence, probabilities), the last two are None for
+        # the remote model. fresh refreshes the face's remote analysis cache entry
+        if analyzer == 'local':
+            with self.classifier_lock:
+                grid, confidence, probabilities = self.classifier.classify(img, center_color=SIDE_COLORS[index],
+                                                                           probabilities=True, face=index)
+            lowest = min(min(row) for row in confidence)
+            if lowest >= self.local_confidence_threshold or not os.environ.get("ANTHROPIC_API_KEY"):
+                return grid, confidence, probabilities
+            # Unsure locally and a key is available: fall back to the remote model
+        grid = analyze_rubiks_cube(img, refresh=fresh)
+        if grid is None:
+            raise ValueError("remote analysis returned no grid")
+        return grid, None, None
+    
+    def scan_probabilities(self):
+        # (54, 6) color probabilities of the whole scan, columns in cube
+        # string color order. Faces read by the local classifier and not
+        # edited since use its probabilities, the rest the default confidence
+        letters = [name[0] for name in COLOR_NAMES]
+        columns = [letters.index(c) for c in cube_state.COLORS]
+        texts = [entry.get().lower() for entry in self.side_entries]
+        probabilities = probabilities_from_confidence(''.join(texts), self.default_confidence)
+        for index, text in enumerate(texts):
+            if self.face_probabilities[index] is not None and text == self.face_reads[index]:
+                probabilities[index * 9:index * 9 + 9] = np.asarray(self.face_probabilities[index])[:, columns]
+        return probabilities
+    
+    def reconcile_scan(self):
+        # Once all six faces are in, replace an impossible scan by the most
+        # likely valid cube and flag only the stickers that stay ambiguous
+        cube_string = ''.join(entry.get().lower() for entry in self.side_entries)
+        if any(c not in cube_state.COLORS for c in cube_string) or not validate(cube_string):
+            return
+        centers = ''.join(color[0] for color in SIDE_COLORS)
+        try:
+            result = reconcile(self.scan_probabilities(), centers=centers)
+        except ValueError as e:
+            self.result_text.config(text=f"Could not reconcile the scan: {e}")
+            return
+        
+        corrected = [p for p in range(54) if result['cube'][p] != cube_string[p]]
+        for side in range(6):
+            face = result['cube'][side * 9:side * 9 + 9]
+            if face != cube_string[side * 9:side * 9 + 9]:
+                self.side_entries[side].delete(0, tk.END)
+                self.side_entries[side].insert(0, face)
+                self.face_reads[side] = face
+                changed = sum(1 for p in corrected if p // 9 == side)
+                self.set_status(side, f"fixed {changed}", "#e67e22")
+        for side in sorted({p // 9 for p in result['rescan']}):
+            self.set_status(side, "rescan", "#c0392b")
+        
+        message = f"Corrected {', '.join(map(facelet_name, corrected))}" if corrected else "Scan is consistent"
+        if result['rescan']:
+            message += f"; please rescan to confirm {', '.join(map(facelet_name, result['rescan']))}"
+        self.result_text.config(text=message)
+        self.check_entries_complete()
+    
+    def new_scan(self):
+        # Forget every face, including what the classifier learned from them
+        for index in range(6):
+            self.detach_job(index)
+            self.side_entries[index].delete(0, tk.END)
+            self.set_status(index, "", "#7f8c8d")
+        self.jobs = {}
+        self.face_reads = [None] * 6
+        self.face_probabilities = [None] * 6
+        self.captured_images = [None] * 6
+        with self.classifier_lock:
+            self.classifier.reset()
+        self.autocapture.last_capture = None
+        self.autocapture.reset()
+        self.captured_canvas.delete("all")
+        self.result_text.config(text="No cube analyzed yet")
+        self.on_entry_select(0)
+        self.check_entries_complete()
     
     def check_entries_complete(self, event=None):
         # Enable solve button if all entries are filled
@@ -235,13 +642,43 @@ class CubeCaptureApp:
         # Get all sides in the correct order
         cube_string = ''.join(entry.get() for entry in self.side_entries)
         
+        # Reject impossible scans here rather than in the solver
+        errors = validate(cube_string)
+        if errors:
+            for side in sorted({p // 9 for e in errors for p in e['positions'] if p < 54}):
+                self.set_status(side, "Check colors", "red")
+            messagebox.showerror("Invalid cube", "\n".join(e['message'] for e in errors[:5]))
+            return
+        
+        if self.on_complete is not None:
+            # Hand the cube over in-process, keeping the Tk root alive
+            self.close()
+            self.on_complete(cube_string)
+            return
+        
         # Launch the solver with the cube string as an argument
         subprocess.Popen([sys.executable, 'rubiks_tutor.py', cube_string])
         
         # Optionally close the capture window
+        self.close()
         self.root.destroy()
+    
+    def close(self):
+        # Stop the preview/poll loops and free the camera, leaving the root window
+        if self.closed:
+            return
+        self.closed = True
+        self.root.unbind("<Return>")
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.grabber.stop()
+        if self.cap.isOpened():
+            self.cap.release()
+        self.frame.destroy()
 
     def __del__(self):
+        if self.closed:
+            return
+        self.grabber.stop()
         if self.cap.isOpened():
             self.cap.release()
         cv2.destroyAllWindows()
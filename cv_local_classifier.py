@@ -0,0 +1,126 @@
+import numpy as np
+from PIL import Image
+
+COLOR_NAMES = ['white', 'yellow', 'red', 'orange', 'blue', 'green']
+
+# Typical webcam sticker colors, only a starting point until calibrated
+DEFAULT_REFERENCE_RGB = {
+    'white': (225, 225, 220),
+    'yellow': (220, 210, 50),
+    'red': (185, 35, 45),
+    'orange': (235, 115, 35),
+    'blue': (25, 75, 170),
+    'green': (35, 155, 75),
+}
+
+# Lightness varies most with lighting, so it counts for less than hue/chroma
+LAB_WEIGHTS = np.array([0.5, 1.0, 1.0])
+
+
+def rgb_to_lab(rgb):
+    """Convert an (..., 3) array of 0-255 sRGB values to CIE Lab (D65)"""
+    rgb = np.asarray(rgb, dtype=np.float64) / 255.0
+    linear = np.where(rgb > 0.04045, ((rgb + 0.055) / 1.055) ** 2.4, rgb / 12.92)
+    xyz = linear @ np.array([[0.4124, 0.2126, 0.0193],
+                             [0.3576, 0.7152, 0.1192],
+                             [0.1805, 0.0722, 0.9505]])
+    xyz /= np.array([0.95047, 1.0, 1.08883])
+    f = np.where(xyz > 216 / 24389, np.cbrt(xyz), (24389 / 27 * xyz + 16) / 116)
+    return np.stack([116 * f[..., 1] - 16,
+                     500 * (f[..., 0] - f[..., 1]),
+                     200 * (f[..., 1] - f[..., 2])], axis=-1)
+
+
+def sample_stickers(image, margin=0.25):
+    """
+    Median RGB of the central patch of each of the 3x3 stickers
+    Args:
+        image: PIL Image or HxWx3 RGB array of the face, like the 300x300 capture frame
+        margin: Fraction of each cell trimmed from every side to avoid the black borders
+    Returns:
+        (3, 3, 3) array of RGB values
+    """
+    if isinstance(image, Image.Image):
+        image = np.asarray(image.convert('RGB'))
+    h, w = image.shape[0] // 3, image.shape[1] // 3
+    cells = image[:h * 3, :w * 3].reshape(3, h, 3, w, 3)
+    y0, y1 = int(h * margin), int(h * (1 - margin))
+    x0, x1 = int(w * margin), int(w * (1 - margin))
+    patches = cells[:, y0:y1, :, x0:x1]
+    return np.median(patches, axis=(1, 3))
+
+
+class StickerClassifier:
+    """
+    Offline sticker color classifier working in Lab space.
+
+    Each face's center sticker is a labelled sample of that face's color,
+    and the latest stickers of each face are clustered around the
+    references, so the references drift toward the actual camera and
+    lighting as faces are captured. A recapture replaces that face's
+    stickers; reset() before scanning another cube.
+    """
+    def __init__(self, sigma=12.0, calibration_weight=0.5):
+        self.sigma = sigma
+        self.calibration_weight = calibration_weight
+        self.references = rgb_to_lab(np.array([DEFAULT_REFERENCE_RGB[c] for c in COLOR_NAMES]))
+        self.samples = {}  # face -> (9, 3) Lab stickers of its latest image
+
+    def calibrate(self, color_name, lab):
+        i = COLOR_NAMES.index(color_name)
+        w = self.calibration_weight
+        self.references[i] = (1 - w) * self.references[i] + w * np.asarray(lab)
+
+    def _probabilities(self, labs):
+        diff = (labs[:, None, :] - self.references[None, :, :]) * LAB_WEIGHTS
+        d2 = (diff ** 2).sum(axis=-1)
+        logits = -d2 / (2 * self.sigma ** 2)
+        logits -= logits.max(axis=1, keepdims=True)
+        p = np.exp(logits)
+        return p / p.sum(axis=1, keepdims=True)
+
+    def _refine(self, samples, iterations=3):
+        # A few k-means steps over the given stickers, anchored to the
+        # current references so clusters keep their color identity
+        samples = np.concatenate(samples)
+        for _ in range(iterations):
+            labels = self._probabilities(samples).argmax(axis=1)
+            for i in range(len(COLOR_NAMES)):
+                members = samples[labels == i]
+                if len(members):
+                    self.references[i] = 0.5 * self.references[i] + 0.5 * members.mean(axis=0)
+
+    def classify(self, image, center_color=None, probabilities=False, face=None):
+        """
+        Classify the 9 stickers of one face
+        Args:
+            image: PIL Image or RGB array of the face
+            center_color: Known color of the face's center sticker, used to calibrate
+            probabilities: Also return the full (9, 6) probabilities, columns in COLOR_NAMES order
+            face: Key of the face in the current scan, e.g. its index; defaults
+                to center_color. With neither, the stickers aren't kept
+        Returns:
+            (grid, confidence): 3x3 list of color names and 3x3 list of probabilities
+        """
+        labs = rgb_to_lab(sample_stickers(image)).reshape(9, 3)
+        if center_color is not None:
+            self.calibrate(center_color, labs[4])
+        key = face if face is not None else center_color
+        if key is None:
+            self._refine(list(self.samples.values()) + [labs])
+        else:
+            self.samples[key] = labs
+            self._refine(list(self.samples.values()))
+
+        p = self._probabilities(labs)
+        if center_color is not None:
+            p[4] = np.eye(len(COLOR_NAMES))[COLOR_NAMES.index(center_color)]
+        best = p.argmax(axis=1)
+        grid = [[COLOR_NAMES[best[r * 3 + c]] for c in range(3)] for r in range(3)]
+        confidence = p.max(axis=1).reshape(3, 3).round(3).tolist()
+        if probabilities:
+            return grid, confidence, p
+        return grid, confidence
+
+    def reset(self):
+        self.__init__(self.sigma, self.calibration_weight)
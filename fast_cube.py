@@ -0,0 +1,134 @@
+"""
+Cheaper drop-in for rubik_solver's Cubie.Cube.
+
+Stickers are never mutated by the solvers, only moved between cubies, so
+they can be shared: parse_cube() builds a cube straight from the 54-char
+ULFRBD string with one interned Sticker per color, clone() copies only the
+cubies' facing dicts, and move() snapshots facing dicts instead of
+deep-copying every cubie it touches. The facelet string is cached and only
+rebuilt after a move.
+
+Setting copy_totals to a [seconds, copies] list counts and times every
+facing dict copied by clone() and move(), on that cube and every clone of
+it, which is how the tutor's stage hooks report copy costs.
+"""
+import time
+from rubik_solver.Cubie import Cube, Sticker, Center, Edge, Corner
+from rubik_solver.Move import Move
+
+_STICKERS = {color: Sticker(color) for color in Sticker.COLOURS}
+
+# (sorted cubie key, facing) of each of the 54 facelets, in string order
+_FACELETS = [(Cube._t_key(cubie), face) for cubie, face in Cube.CUBE_MAP]
+
+# Same key order as Cube() so solvers scanning cubies see them identically
+_CUBIE_KEYS = [Cube._t_key(cubie) for cubie in Cube.CUBIES]
+_CUBIE_TYPES = {1: Center, 2: Edge, 3: Corner}
+
+
+def _build_changes(face, counterclockwise):
+    # Cube.move_changes as (origin key, dest key, [(origin facing, dest facing)])
+    changes = Cube.MOVES[face]
+    if counterclockwise:
+        changes = [(c1, c0) for c0, c1 in changes]
+    return [(Cube._t_key(origin), Cube._t_key(dest), list(zip(origin, dest))) for origin, dest in changes]
+
+
+_CHANGES = {(face, ccw): _build_changes(face, ccw) for face in Cube.MOVES for ccw in (False, True)}
+
+
+class FastCube(Cube):
+    """Cubie.Cube with cheap cloning, a leaner move() and a cached facelet string"""
+    def __init__(self, size=3):
+        super().__init__(size)
+        self._facelets = None
+        self.copy_totals = None
+
+    def clone(self):
+        """Copy sharing the immutable Stickers, equivalent to copy.deepcopy"""
+        totals = self.copy_totals
+        if totals is not None:
+            start = time.perf_counter()
+        new = FastCube.__new__(FastCube)
+        new.size = self.size
+        new._facelets = self._facelets
+        new.copy_totals = totals
+        new.cubies = {}
+        for key, cubie in self.cubies.items():
+            copy = cubie.__class__.__new__(cubie.__class__)
+            copy.facings = dict(cubie.facings)
+            new.cubies[key] = copy
+        if totals is not None:
+            totals[0] += time.perf_counter() - start
+            totals[1] += len(new.cubies)
+        return new
+
+    def __deepcopy__(self, memo):
+        return self.clone()
+
+    def facelets(self):
+        """The cube as a 54-char ULFRBD color string"""
+        if self._facelets is None:
+            cubies = self.cubies
+            self._facelets = ''.join([cubies[key].facings[face].color for key, face in _FACELETS])
+        return self._facelets
+
+    def to_naive_cube(self):
+        from rubik_solver.NaiveCube import NaiveCube
+        nc = NaiveCube(self.size)
+        nc.set_cube(self.facelets())
+        return nc
+
+    def from_naive_cube(self, cube):
+        super().from_naive_cube(cube)
+        self._facelets = None
+
+    def move(self, move):
+        if not isinstance(move, Move):
+            raise ValueError("Move must be an instance of Move")
+        self._facelets = None
+        self._apply(_CHANGES[move.face, move.counterclockwise])
+        if move.double:
+            # Cube.move finishes a double turn with a clockwise quarter turn
+            self._apply(_CHANGES[move.face, False])
+
+    def _apply(self, changes):
+        cubies = self.cubies
+        totals = self.copy_totals
+        # Facings of cubies already overwritten in this turn, by key
+        original = {}
+        for origin_key, dest_key, facings in changes:
+            origin = original[origin_key] if origin_key in original else cubies[origin_key].facings
+            dest = cubies[dest_key].facings
+            if totals is None:
+                original[dest_key] = dict(dest)
+            else:
+                start = time.perf_counter()
+                original[dest_key] = dict(dest)
+                totals[0] += time.perf_counter() - start
+                totals[1] += 1
+            for origin_facing, dest_facing in facings:
+                dest[dest_facing] = origin[origin_facing]
+
+
+def parse_cube(cube_string):
+    """Build a FastCube directly from a 54-char ULFRBD color string"""
+    if len(cube_string) != 54:
+        raise ValueError('The cube configuration must be exactly 54 characters long.')
+    cube = FastCube.__new__(FastCube)
+    cube.size = 3
+    cube.copy_totals = None
+    facings = {}
+    for (key, face), color in zip(_FACELETS, cube_string.lower()):
+        sticker = _STICKERS.get(color)
+        if sticker is None:
+            raise ValueError('Invalid color, got %s and should be one of %s' % (color, ','.join(Sticker.COLOURS)))
+        facings.setdefault(key, {})[face] = sticker
+    cube.cubies = {}
+    for key in _CUBIE_KEYS:
+        cubie_type = _CUBIE_TYPES[len(key)]
+        cubie = cubie_type.__new__(cubie_type)
+        cubie.facings = facings[key]
+        cube.cubies[key] = cubie
+    cube._facelets = cube_string.lower()
+    return cube
@@ -0,0 +1,120 @@
+"""
+Load test for solve_service.py on localhost.
+
+    python load_test.py --requests 500 --concurrency 32 --unique 50
+    python load_test.py --spawn --workers 2
+
+Sends POST /solve requests over keep-alive connections, drawing cubes from
+a seeded corpus of 'unique' scrambles so that repeats exercise request
+coalescing, then prints throughput, latency percentiles, status counts and
+the service's own metrics.
+"""
+import sys
+import json
+import time
+import random
+import asyncio
+import subprocess
+import fire
+from benchmark import generate_corpus, _percentiles
+
+
+async def _request(reader, writer, method, path, payload=None):
+    body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+    writer.write((f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+                  f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n").encode('latin-1') + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def _client(host, port, queue, results):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while True:
+            try:
+                cube = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            status, _ = await _request(reader, writer, 'POST', '/solve', {'cube': cube})
+            results.append((status, time.perf_counter() - start))
+    finally:
+        writer.close()
+
+
+async def _wait_until_up(host, port, timeout=30):
+    deadline = time.time() + timeout
+    while True:
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+            await _request(reader, writer, 'GET', '/health')
+            writer.close()
+            return
+        except OSError:
+            if time.time() > deadline:
+                raise
+            await asyncio.sleep(0.2)
+
+
+async def _run(host, port, requests, concurrency, unique, seed):
+    cubes = generate_corpus(unique, seed)
+    rng = random.Random(seed)
+    queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(rng.choice(cubes))
+
+    await _wait_until_up(host, port)
+    results = []
+    start = time.perf_counter()
+    await asyncio.gather(*[_client(host, port, queue, results) for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(host, port)
+    _, metrics = await _request(reader, writer, 'GET', '/metrics')
+    writer.close()
+
+    statuses = {}
+    for status, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    ok = [latency for status, latency in results if status == 200]
+    return {
+        'requests': len(results),
+        'elapsed_s': elapsed,
+        'throughput_per_s': len(results) / elapsed,
+        'status_counts': statuses,
+        'latency_ms': _percentiles(ok, 1000) if ok else None,
+    }, metrics.decode('utf-8')
+
+
+def main(host='127.0.0.1', port=8765, requests=200, concurrency=16, unique=50, seed=0,
+         spawn=False, workers=None, max_pending=64):
+    """
+    Fire requests at a running service, or start one first with --spawn
+    """
+    server = None
+    if spawn:
+        command = [sys.executable, 'solve_service.py', '--host', host, '--port', str(port), '--max_pending', str(max_pending)]
+        if workers is not None:
+            command += ['--workers', str(workers)]
+        server = subprocess.Popen(command)
+    try:
+        summary, metrics = asyncio.run(_run(host, port, requests, concurrency, unique, seed))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    print(json.dumps(summary, indent=2))
+    print(metrics, end='')
+
+
+if __name__ == '__main__':
+    fire.Fire(main)
@@ -0,0 +1,151 @@
+"""
+Animated layer turns for the tutor's matplotlib canvas.
+
+A turn only moves the stickers of one layer, so frames are blitted: the
+empty figure is rendered once into a cached background, and every frame
+restores it, draws just the sticker collection and blits the result, with
+no full figure redraw. Frames follow the wall clock, so a slow machine
+skips ahead (counted as dropped frames) and never falls behind.
+"""
+import time
+from collections import deque
+import numpy as np
+from visualize import layer_turn
+
+
+class FrameStats:
+    """Rolling frame telemetry of the animations"""
+    def __init__(self, target_fps, window=240):
+        self.target_fps = target_fps
+        self.draw_times = deque(maxlen=window)  # seconds spent drawing each frame
+        self.intervals = deque(maxlen=window)   # seconds between shown frames
+        self.frames = 0
+        self.dropped = 0
+
+    def record(self, draw_seconds, interval=None, dropped=0):
+        self.frames += 1
+        self.dropped += dropped
+        self.draw_times.append(draw_seconds)
+        if interval is not None:
+            self.intervals.append(interval)
+
+    def summary(self):
+        draw = np.array(self.draw_times) if self.draw_times else np.zeros(1)
+        fps = 1 / np.mean(self.intervals) if self.intervals else 0.0
+        return {
+            'fps': float(fps),
+            'target_fps': self.target_fps,
+            'draw_mean_ms': 1000 * float(draw.mean()),
+            'draw_p95_ms': 1000 * float(np.percentile(draw, 95)),
+            'frames': self.frames,
+            'dropped': self.dropped,
+        }
+
+    def text(self):
+        s = self.summary()
+        return (f"{s['fps']:.1f} fps (target {s['target_fps']}), frame {s['draw_mean_ms']:.1f} ms mean / "
+                f"{s['draw_p95_ms']:.1f} ms p95, {s['dropped']} of {s['frames'] + s['dropped']} frames dropped")
+
+
+def _ease(t):
+    # Smoothstep, so the layer starts and settles gently
+    return t * t * (3 - 2 * t)
+
+
+class MoveAnimator:
+    """
+    Plays layer turns on a CubeRenderer, driven by Tk's after()
+    Args:
+        root: Tk root (or any widget) used for scheduling
+        canvas: The FigureCanvasTkAgg the renderer draws on
+        target_fps: Frames per second to aim for
+    """
+    def __init__(self, root, canvas, target_fps=30):
+        self.root = root
+        self.canvas = canvas
+        self.stats = FrameStats(target_fps)
+        self.background = None
+        self._job = None
+        self._turn = None
+        canvas.mpl_connect('resize_event', self._invalidate)
+
+    @property
+    def running(self):
+        return self._turn is not None
+
+    def _invalidate(self, event=None):
+        self.background = None
+
+    def start(self, renderer, move, end_config, reverse=False, duration=0.3, on_done=None):
+        """
+        Turn the layer of move from the renderer's current state to end_config;
+        reverse plays the move backwards (undo). Any running turn is finished first
+        """
+        self.finish()
+        indices, axis, degrees = layer_turn(move)
+        if reverse:
+            degrees = -degrees
+        now = time.perf_counter()
+        self._turn = {
+            'renderer': renderer, 'indices': indices, 'axis': axis, 'degrees': degrees,
+            'end_config': end_config, 'duration': duration, 'on_done': on_done,
+            'start': now, 'last_frame': now, 'last_slot': 0,
+        }
+        self._frame()
+
+    def _frame(self):
+        self._job = None
+        turn = self._turn
+        now = time.perf_counter()
+        t = (now - turn['start']) / turn['duration']
+        if t >= 1:
+            self.finish()
+            return
+
+        # Frame slots that passed without a frame were dropped
+        interval = 1 / self.stats.target_fps
+        slot = int((now - turn['start']) / interval)
+        dropped = max(0, slot - turn['last_slot'] - 1)
+        turn['last_slot'] = slot
+
+        draw_start = time.perf_counter()
+        turn['renderer'].turn(turn['indices'], turn['axis'], turn['degrees'] * _ease(t))
+        self._blit(turn['renderer'])
+        drawn = time.perf_counter()
+        self.stats.record(drawn - draw_start, now - turn['last_frame'] if slot else None, dropped)
+        turn['last_frame'] = now
+
+        # Aim for the next slot boundary, whatever this frame cost
+        delay = (slot + 1) * interval - (drawn - turn['start'])
+        self._job = self.root.after(max(1, int(1000 * delay) + 1), self._frame)
+
+    def _blit(self, renderer):
+        canvas = self.canvas
+        collection = renderer.collection
+        if self.background is None:
+            collection.set_visible(False)
+            canvas.draw()
+            self.background = canvas.copy_from_bbox(canvas.figure.bbox)
+            collection.set_visible(True)
+        canvas.restore_region(self.background)
+        collection.do_3d_projection()
+        renderer.ax.draw_artist(collection)
+        canvas.blit(canvas.figure.bbox)
+
+    def cancel(self):
+        """Stop the running turn without drawing its end state or calling on_done"""
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+        self._turn = None
+
+    def finish(self):
+        """Jump the running turn to its end state and call its on_done"""
+        turn = self._turn
+        if turn is None:
+            return
+        self.cancel()
+        turn['renderer'].update(turn['end_config'])
+        self._blit(turn['renderer'])
+        if turn['on_done'] is not None:
+            turn['on_done']()
@@ -0,0 +1,79 @@
+from rubik_solver.Move import Move
+
+# Moves on the same axis commute, so they can be reordered to meet a partner
+AXES = {
+    'U': 'Y', 'D': 'Y', 'E': 'Y', 'Y': 'Y',
+    'L': 'X', 'R': 'X', 'M': 'X', 'X': 'X',
+    'F': 'Z', 'B': 'Z', 'S': 'Z', 'Z': 'Z',
+}
+
+
+def simplify_solution(moves, step_names, across_stages=False):
+    """
+    Shorten a move sequence without changing what it does.
+
+    Cancels R R', folds R R R into R', and merges same-face moves separated
+    only by commuting moves on the same axis (R L R -> R2 L). step_names is
+    kept parallel to the result; a merged move keeps the stage of its first
+    half.
+    Args:
+        moves: List of Move objects or move strings
+        step_names: Stage name of each move
+        across_stages: Also merge moves from neighbouring stages. The full
+            sequence stays equivalent, but the cube at a stage boundary may
+            then differ from the original solution
+    Returns:
+        (moves, step_names) of the simplified sequence
+    """
+    if len(moves) != len(step_names):
+        raise ValueError("moves and step_names must have the same length")
+
+    stack = []  # [Move, stage] pairs of the simplified sequence so far
+    for move, stage in zip(moves, step_names):
+        move = Move(str(move))
+        axis = AXES[move.face]
+        merged = False
+        # Walk back over the trailing run of same-axis moves looking for a partner
+        for i in range(len(stack) - 1, -1, -1):
+            other, other_stage = stack[i]
+            if AXES[other.face] != axis or (other_stage != stage and not across_stages):
+                break
+            if other.face == move.face:
+                combined = other + move
+                if combined is None:
+                    del stack[i]
+                else:
+                    stack[i][0] = combined
+                merged = True
+                break
+        if not merged:
+            stack.append([move, stage])
+
+    return [m for m, _ in stack], [s for _, s in stack]
+
+
+def _stage_end_states(cube, moves, step_names):
+    import cube_state
+    state = cube_state.from_string(cube)
+    ends = {}
+    for move, stage in zip(moves, step_names):
+        state = cube_state.apply_move(state, move)
+        ends[stage] = state
+    return state, ends
+
+
+def verify_simplification(cube, original, simplified, per_stage=True):
+    """
+    Check a simplified solution against the original for a cube string.
+
+    original and simplified are (moves, step_names) tuples. The final states
+    must match and, with per_stage, so must the state at the end of each
+    stage that still has moves.
+    """
+    final, ends = _stage_end_states(cube, *original)
+    new_final, new_ends = _stage_end_states(cube, *simplified)
+    if (final != new_final).any():
+        return False
+    if per_stage:
+        return all((ends[stage] == state).all() for stage, state in new_ends.items())
+    return True
@@ -0,0 +1,55 @@
+"""
+Process pool helpers shared by the batch tools.
+
+bounded_map keeps a bounded window of tasks in flight, so an input of any
+size is consumed lazily and results stream out as they are ready.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+_END = object()
+
+
+def resolve_workers(workers=None):
+    """Number of worker processes to use, os.cpu_count() when workers is None"""
+    return workers or os.cpu_count() or 1
+
+
+def bounded_map(fn, items, workers=None, window=4, ordered=True):
+    """
+    Run fn(item) for every item of an iterable across a process pool
+    Args:
+        fn: Picklable function of one item
+        items: Iterable of picklable items (consumed lazily)
+        workers: Number of worker processes, None for os.cpu_count()
+        window: Tasks in flight per worker
+        ordered: Yield results in input order if True, otherwise as they complete
+    Yields:
+        fn(item) per item
+    """
+    workers = resolve_workers(workers)
+    max_pending = workers * window
+    items = iter(items)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = []
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < max_pending:
+                item = next(items, _END)
+                if item is _END:
+                    exhausted = True
+                    break
+                pending.append(executor.submit(fn, item))
+
+            if not pending:
+                return
+
+            if ordered:
+                # Later tasks keep running while we wait on the oldest one
+                yield pending.pop(0).result()
+                continue
+
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                pending.remove(future)
+                yield future.result()
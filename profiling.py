@@ -0,0 +1,132 @@
+"""
+Per-stage profiling for BeginnerSolverAnnotated.
+
+    stats = StageStats()
+    solve(cube, hooks=[stats])
+    print(stats.to_prometheus())
+
+StageProfiler additionally runs cProfile around each stage. Both are plain
+solver hooks, so nothing is measured unless they are passed to solve().
+"""
+import io
+import json
+import pstats
+import cProfile
+import fire
+
+
+class StageStats:
+    """Aggregates stage records over any number of solves"""
+    def __init__(self):
+        self.stages = {}  # stage name -> totals, in first-seen order
+        self.solves = 0
+
+    def after_stage(self, record):
+        name = record['stage']
+        if name == 'Setup':
+            self.solves += 1
+        totals = self.stages.setdefault(name, {
+            'count': 0, 'seconds': 0.0, 'max_seconds': 0.0,
+            'moves': 0, 'max_moves': 0, 'copy_seconds': 0.0, 'copies': 0,
+        })
+        totals['count'] += 1
+        totals['seconds'] += record['seconds']
+        totals['max_seconds'] = max(totals['max_seconds'], record['seconds'])
+        totals['moves'] += record['moves']
+        totals['max_moves'] = max(totals['max_moves'], record['moves'])
+        totals['copy_seconds'] += record['copy_seconds']
+        totals['copies'] += record['copies']
+
+    def summary(self):
+        summary = {'solves': self.solves, 'stages': {}}
+        for name, totals in self.stages.items():
+            count = totals['count']
+            summary['stages'][name] = dict(totals,
+                                           mean_seconds=totals['seconds'] / count,
+                                           mean_moves=totals['moves'] / count,
+                                           copy_fraction=totals['copy_seconds'] / totals['seconds'] if totals['seconds'] else 0.0)
+        return summary
+
+    def to_json(self, indent=2):
+        return json.dumps(self.summary(), indent=indent)
+
+    def to_prometheus(self, prefix='rubiks_solver'):
+        lines = [
+            f"# HELP {prefix}_solves_total Number of profiled solves",
+            f"# TYPE {prefix}_solves_total counter",
+            f"{prefix}_solves_total {self.solves}",
+        ]
+        metrics = [
+            ('stage_seconds_total', 'seconds', 'counter', 'Wall time spent in each stage'),
+            ('stage_runs_total', 'count', 'counter', 'Number of times each stage ran'),
+            ('stage_moves_total', 'moves', 'counter', 'Moves produced by each stage'),
+            ('stage_copy_seconds_total', 'copy_seconds', 'counter', 'Time spent copying cubies in each stage'),
+            ('stage_copies_total', 'copies', 'counter', 'Cubie copies made in each stage'),
+            ('stage_max_seconds', 'max_seconds', 'gauge', 'Slowest single run of each stage'),
+            ('stage_max_moves', 'max_moves', 'gauge', 'Longest single run of each stage'),
+        ]
+        for metric, key, kind, help_text in metrics:
+            lines.append(f"# HELP {prefix}_{metric} {help_text}")
+            lines.append(f"# TYPE {prefix}_{metric} {kind}")
+            for name, totals in self.stages.items():
+                lines.append(f'{prefix}_{metric}{{stage="{name}"}} {totals[key]}')
+        return '\n'.join(lines) + '\n'
+
+
+class StageProfiler:
+    """Collects a separate cProfile per stage, accumulated across solves"""
+    def __init__(self):
+        self.profiles = {}
+        self._active = None
+
+    def before_stage(self, stage):
+        self._active = self.profiles.setdefault(stage, cProfile.Profile())
+        self._active.enable()
+
+    def after_stage(self, record):
+        if self._active is not None:
+            self._active.disable()
+            self._active = None
+
+    def report(self, stage, sort='cumulative', limit=15):
+        out = io.StringIO()
+        pstats.Stats(self.profiles[stage], stream=out).sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def dump(self, prefix):
+        """Write one .prof file per stage, loadable with pstats or snakeviz"""
+        paths = []
+        for stage, profile in self.profiles.items():
+            path = f"{prefix}.{stage.lower().replace(' ', '_')}.prof"
+            profile.dump_stats(path)
+            paths.append(path)
+        return paths
+
+
+def main(n=100, seed=0, format='json', cprofile=None):
+    """
+    Profile n seeded scrambles stage by stage
+    Args:
+        format: 'json' or 'prometheus'
+        cprofile: Path prefix to also write a cProfile dump per stage
+    """
+    from rubiks_tutor import solve
+    from benchmark import generate_corpus
+
+    stats = StageStats()
+    hooks = [stats]
+    profiler = None
+    if cprofile:
+        profiler = StageProfiler()
+        hooks.append(profiler)
+    for cube in generate_corpus(n, seed):
+        solve(cube, hooks=hooks)
+
+    print(stats.to_prometheus() if format == 'prometheus' else stats.to_json())
+    if profiler is not None:
+        for path in profiler.dump(cprofile):
+            print(f"wrote {path}")
+
+
+if __name__ == '__main__':
+    fire.Fire(main)
@@ -1,67 +1,154 @@
 import sys
 import tkinter as tk
 from tkinter import ttk
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
 from rubik_solver.Solver import Solver
 from rubik_solver.Solver.Beginner import WhiteCrossSolver, WhiteFaceSolver, SecondLayerSolver, YellowCrossSolver, YellowFaceSolver
 from rubik_solver.NaiveCube import NaiveCube
 from rubik_solver.Cubie import Cube
 from rubik_solver.Move import Move
-from visualize import visualize_rubiks_cube
+from move_simplifier import simplify_solution
+from fast_cube import FastCube, parse_cube
+from cube_validation import check_cube
+from two_phase import TwoPhaseSolver
 import copy
-from cv_input import CubeCaptureApp
+import time
+
+# Beginner method stages, in solving order
+STAGES = [
+    ('White Cross', WhiteCrossSolver.WhiteCrossSolver),
+    ('White Side', WhiteFaceSolver.WhiteFaceSolver),
+    ('Second Layer', SecondLayerSolver.SecondLayerSolver),
+    ('Yellow Cross', YellowCrossSolver.YellowCrossSolver),
+    ('Yellow Face', YellowFaceSolver.YellowFaceSolver),
+]
+
+# Longest layer turn animation in seconds, and its target frame rate
+ANIMATION_SECONDS = 0.3
+ANIMATION_FPS = 30
 
 class BeginnerSolverAnnotated(Solver):
-    def solution(self):
+    """
+    Beginner method solver that labels each move with its stage.
+
+    hooks are objects with optional before_stage(stage) and
+    after_stage(record) methods, record being a dict with 'stage',
+    'seconds', 'moves', 'copy_seconds' and 'copies'. The initial cube copy is
+    reported as a 'Setup' stage. Without hooks no timing is done at all.
+    """
+    def __init__(self, cube, hooks=None):
+        super().__init__(cube)
+        self.hooks = list(hooks) if hooks else []
+    
+    def stages(self):
+        """Yield (stage_name, moves) as soon as each stage is solved"""
+        if self.hooks:
+            yield from self._instrumented_stages()
+            return
+        
         cube = copy.deepcopy(self.cube)
+        for name, stage_solver in STAGES:
+            yield name, [Move(m) for m in stage_solver(cube).solution()]
+    
+    def solution(self):
         solution = []
         step_name = []
         
-        solution_step = WhiteCrossSolver.WhiteCrossSolver(cube).solution()
-        step_name += ['White Cross'] * len(solution_step)
-        solution += solution_step
-        
-        solution_step = WhiteFaceSolver.WhiteFaceSolver(cube).solution()
-        step_name += ['White Side'] * len(solution_step)
-        solution += solution_step
-        
-        solution_step = SecondLayerSolver.SecondLayerSolver(cube).solution()
-        step_name += ['Second Layer'] * len(solution_step)
-        solution += solution_step
-        
-        solution_step = YellowCrossSolver.YellowCrossSolver(cube).solution()
-        step_name += ['Yellow Cross'] * len(solution_step)
-        solution += solution_step
+        for name, moves in self.stages():
+            step_name += [name] * len(moves)
+            solution += moves
         
-        solution_step = YellowFaceSolver.YellowFaceSolver(cube).solution()
-        step_name += ['Yellow Cross'] * len(solution_step)
-        solution += solution_step
+        return solution, step_name
+    
+    def _instrumented_stages(self):
+        # The working copy and every clone made from it add their facing
+        # dict copies to totals, see FastCube.copy_totals
+        totals = [0.0, 0]
+        start = time.perf_counter()
+        self.cube.copy_totals = totals
+        try:
+            cube = copy.deepcopy(self.cube)
+        finally:
+            self.cube.copy_totals = None
+        elapsed = time.perf_counter() - start
+        self._after_stage({'stage': 'Setup', 'seconds': elapsed, 'moves': 0,
+                           'copy_seconds': totals[0], 'copies': totals[1]})
         
-        return [Move(m) for m in solution], step_name
+        for name, stage_solver in STAGES:
+            for hook in self.hooks:
+                if hasattr(hook, 'before_stage'):
+                    hook.before_stage(name)
+            totals[:] = [0.0, 0]
+            start = time.perf_counter()
+            solution_step = stage_solver(cube).solution()
+            elapsed = time.perf_counter() - start
+            self._after_stage({'stage': name, 'seconds': elapsed, 'moves': len(solution_step),
+                               'copy_seconds': totals[0], 'copies': totals[1]})
+            yield name, [Move(m) for m in solution_step]
+    
+    def _after_stage(self, record):
+        for hook in self.hooks:
+            if hasattr(hook, 'after_stage'):
+                hook.after_stage(record)
 
 def _check_valid_cube(cube):
     if isinstance(cube, str):
-        c = NaiveCube()
-        c.set_cube(cube)
-        cube = c
+        check_cube(cube)
+        return parse_cube(cube)
+    if isinstance(cube, Cube) and not isinstance(cube, FastCube):
+        # Solve a FastCube copy, so copies are cheap and counted the same way
+        cube = cube.to_naive_cube()
     if isinstance(cube, NaiveCube):
-        c = Cube()
+        check_cube(cube.get_cube())
+        c = FastCube()
         c.from_naive_cube(cube)
         cube = c
     if not isinstance(cube, Cube):
         raise ValueError('Cube is not one of (str, NaiveCube or Cubie.Cube)')
     return cube
 
-def solve(cube):
+METHODS = {
+    'beginner': BeginnerSolverAnnotated,
+    'two_phase': TwoPhaseSolver,
+}
+
+def solve_stages(cube, simplify=False, hooks=None):
+    """
+    Yield (stage_name, moves) of a beginner method solution, one stage at a
+    time as each stage solver finishes. Simplification never merges moves
+    across stages, so simplifying stage by stage gives the same moves as
+    simplifying the whole solution.
+    """
     cube = _check_valid_cube(cube)
-    solver = BeginnerSolverAnnotated(cube)
-    return solver.solution()
+    for name, moves in BeginnerSolverAnnotated(cube, hooks=hooks).stages():
+        if simplify:
+            moves, _ = simplify_solution(moves, [name] * len(moves))
+        yield name, moves
+
+def solve(cube, simplify=False, method='beginner', hooks=None):
+    if method not in METHODS:
+        raise ValueError('Invalid method name, must be one of (%s)' % ', '.join(METHODS.keys()))
+    if method == 'beginner':
+        solution = []
+        step_names = []
+        for name, moves in solve_stages(cube, simplify, hooks):
+            step_names += [name] * len(moves)
+            solution += moves
+        return solution, step_names
+    if hooks:
+        raise ValueError('Stage hooks are only supported by the beginner method')
+    solver = METHODS[method](_check_valid_cube(cube))
+    solution, step_names = solver.solution()
+    if simplify:
+        solution, step_names = simplify_solution(solution, step_names)
+    return solution, step_names
 
 class RubiksSolverGUI:
     def __init__(self, root, cube_string=None):
+        # Plotting and the state timeline are only needed by the GUI, so
+        # headless users of solve() don't pay for importing them
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+        
         self.root = root
         self.root.title("Rubik's Cube Solver")
         self.root.geometry("800x800")
@@ -98,6 +185,27 @@ class RubiksSolverGUI:
         self.next_button = ttk.Button(nav_frame, text="Next Move", command=self.apply_next_move, state='disabled')
         self.next_button.pack(side=tk.LEFT, padx=5)
         
+        # Stage selector and scrubber
+        self.stage_var = tk.StringVar()
+        self.stage_combo = ttk.Combobox(nav_frame, textvariable=self.stage_var, state='disabled', width=15)
+        self.stage_combo.bind('<<ComboboxSelected>>', self.jump_to_stage)
+        self.stage_combo.pack(side=tk.LEFT, padx=5)
+        
+        # Autoplay and its speed in moves per second
+        play_frame = ttk.Frame(main_frame)
+        play_frame.pack(pady=5)
+        self.play_button = ttk.Button(play_frame, text="Play", command=self.toggle_autoplay, state='disabled')
+        self.play_button.pack(side=tk.LEFT, padx=5)
+        ttk.Label(play_frame, text="Speed").pack(side=tk.LEFT)
+        self.speed = tk.DoubleVar(value=1.0)
+        ttk.Scale(play_frame, from_=0.25, to=4.0, orient=tk.HORIZONTAL, length=150, variable=self.speed,
+                  command=self.on_speed).pack(side=tk.LEFT, padx=5)
+        self.speed_label = ttk.Label(play_frame, text="1.0 moves/s", width=12)
+        self.speed_label.pack(side=tk.LEFT)
+        
+        self.slider = ttk.Scale(main_frame, from_=0, to=0, orient=tk.HORIZONTAL, length=500, command=self.on_slider, state='disabled')
+        self.slider.pack(pady=5)
+        
         # Move and step labels
         self.move_label = ttk.Label(main_frame, text="Enter a cube definition and click 'Solve'")
         self.move_label.pack(pady=5)
@@ -109,10 +217,23 @@ class RubiksSolverGUI:
         self.solution_label = ttk.Label(main_frame, text="", wraplength=700)
         self.solution_label.pack(pady=5)
         
+        # Animation frame telemetry
+        self.frame_label = ttk.Label(main_frame, text="", foreground="gray")
+        self.frame_label.pack(pady=5)
+        
+        from move_animation import MoveAnimator
+        self.animator = MoveAnimator(root, self.canvas, target_fps=ANIMATION_FPS)
+        self.autoplay = False
+        self.autoplay_job = None
+        
         # Initialize other attributes
-        self.cube = None
+        self.timeline = None
+        self.stage_iter = None
+        self.solving = False
+        self.renderer = None
         self.solution = None
         self.step_names = None
+        self.unsimplified_length = 0
         self.move_index = 0
         self.cube_sides = [""] * 6
         
@@ -121,76 +242,215 @@ class RubiksSolverGUI:
             self.solve_cube()
     
     def solve_cube(self):
+        # Stages are solved one per event loop turn, so the first moves can
+        # be stepped through while later stages are still being computed
         try:
-            self.cube = _check_valid_cube(self.cube_string)
-            self.solution, self.step_names = solve(self.cube_string)
-            self.move_index = 0
-            
-            self.update_cube_display()
-            self.update_solution_label()
-            self.move_label.config(text="Click 'Next Move' to start")
-            self.step_label.config(text="")
-            
-            self.next_button.config(state='normal')
-            self.prev_button.config(state='disabled')
+            cube = _check_valid_cube(self.cube_string)
         except ValueError as e:
-            self.move_label.config(text=f"Error: {str(e)}")
-            self.step_label.config(text="")
-            self.solution_label.config(text="")
-            self.next_button.config(state='disabled')
-            self.prev_button.config(state='disabled')
-            self.axes.clear()
-            self.canvas.draw()
+            self.show_error(e)
+            return
+        from solution_timeline import SolutionTimeline
+        self.stage_iter = BeginnerSolverAnnotated(cube).stages()
+        self.solution = []
+        self.step_names = []
+        self.unsimplified_length = 0
+        self.timeline = SolutionTimeline(self.cube_string, [], [])
+        self.move_index = 0
+        self.solving = True
+        
+        self.update_cube_display()
+        self.move_label.config(text=f"Solving {STAGES[0][0]}...")
+        self.step_label.config(text="")
+        self.solution_label.config(text="")
+        self.stage_var.set("")
+        self.slider.set(0)
+        self.update_nav_buttons()
+        self.root.after(1, self.solve_next_stage, self.stage_iter)
+    
+    def solve_next_stage(self, stage_iter):
+        if stage_iter is not self.stage_iter:
+            return  # a newer solve has started
+        try:
+            stage = next(stage_iter, None)
+        except Exception as e:
+            # Raised in a Tk callback, so report it rather than leave the
+            # tutor stuck solving
+            self.show_error(e)
+            return
+        waiting = self.move_index > 0 and self.move_index == len(self.solution)
+        if stage is None:
+            self.solving = False
+        else:
+            name, moves = stage
+            self.unsimplified_length += len(moves)
+            moves, step_names = simplify_solution(moves, [name] * len(moves))
+            self.solution += moves
+            self.step_names += step_names
+            self.timeline.extend(moves, step_names)
+            self.root.after(1, self.solve_next_stage, stage_iter)
+        
+        if self.timeline.stages:
+            self.stage_combo.config(values=self.timeline.stage_names(), state='readonly')
+        self.slider.config(to=len(self.solution), state='normal')
+        if self.move_index == 0:
+            if self.solution:
+                self.move_label.config(text="Click 'Next Move' to start")
+            else:
+                self.move_label.config(text="Solving..." if self.solving else "Cube is already solved")
+        elif waiting:
+            self.go_to_move(self.move_index)
+        self.update_solution_label()
+        self.update_nav_buttons()
+    
+    def show_error(self, e):
+        self.stage_iter = None
+        self.solving = False
+        self.stop_autoplay()
+        self.animator.cancel()
+        self.move_label.config(text=f"Error: {str(e)}")
+        self.step_label.config(text="")
+        self.solution_label.config(text="")
+        self.next_button.config(state='disabled')
+        self.prev_button.config(state='disabled')
+        self.stage_combo.config(state='disabled')
+        self.slider.config(state='disabled')
+        self.play_button.config(state='disabled')
+        self.renderer = None
+        self.axes.clear()
+        self.canvas.draw()
     
     def update_solution_label(self):
         if self.move_index < len(self.solution):
             solution_text = ", ".join(str(move) for move in self.solution)
-            self.solution_label.config(text=f"Full solution: {solution_text}")
+            heading = "Solution so far" if self.solving else "Full solution"
+            self.solution_label.config(text=f"{heading} ({len(self.solution)} moves, "
+                                            f"{self.unsimplified_length} before simplification): {solution_text}")
+    
+    def update_nav_buttons(self):
+        self.prev_button.config(state='normal' if self.move_index > 0 else 'disabled')
+        self.next_button.config(state='normal' if self.move_index < len(self.solution) else 'disabled')
+        done = self.move_index == len(self.solution) and not self.solving
+        self.play_button.config(state='normal' if self.solution and not done else 'disabled')
+        if done:
+            self.stop_autoplay()
+    
+    def go_to_move(self, index, animate=False):
+        # Every state is precomputed, so jumping anywhere is a lookup. Single
+        # steps can be animated as a turn of the moved layer
+        previous = self.move_index
+        self.move_index = max(0, min(index, len(self.solution)))
+        if self.move_index == 0:
+            self.move_label.config(text="Initial state")
+            self.step_label.config(text="")
+        elif self.move_index == len(self.solution) and self.solving:
+            self.move_label.config(text=f"Move {self.move_index}/{len(self.solution)}+: waiting for the next stage...")
+            self.step_label.config(text=f"Step: {self.timeline.stage_at(self.move_index)}")
+        elif self.move_index == len(self.solution):
+            self.move_label.config(text="Solved!")
+            self.step_label.config(text="Completed!")
+        else:
+            move = self.solution[self.move_index - 1]
+            self.move_label.config(text=f"Move {self.move_index}/{len(self.solution)}: {move}")
+            self.step_label.config(text=f"Step: {self.timeline.stage_at(self.move_index)}")
+        if round(float(self.slider.get())) != self.move_index:
+            self.slider.set(self.move_index)
+        if animate and self.renderer is not None and abs(self.move_index - previous) == 1:
+            self.animate_move(previous)
+        else:
+            self.update_cube_display()
+        self.update_solution_label()
+        self.update_nav_buttons()
+    
+    def animate_move(self, previous):
+        # Turn the layer from state previous to the current one
+        forward = self.move_index > previous
+        move = self.solution[min(previous, self.move_index)]
+        self.animator.start(self.renderer, move, self.timeline.cube_string(self.move_index), reverse=not forward,
+                            duration=self.turn_duration(), on_done=self.on_turn_done)
+    
+    def turn_duration(self):
+        # Most of each move's time at the chosen speed, capped so manual
+        # stepping stays snappy
+        return min(ANIMATION_SECONDS, 0.7 / self.speed.get())
+    
+    def on_turn_done(self):
+        self.frame_label.config(text=f"Animation: {self.animator.stats.text()}")
+        if self.autoplay:
+            self.schedule_autoplay(max(0.0, 1 / self.speed.get() - self.turn_duration()))
+    
+    def on_speed(self, value):
+        self.speed_label.config(text=f"{float(value):.1f} moves/s")
+    
+    def toggle_autoplay(self):
+        if self.autoplay:
+            self.stop_autoplay()
+        else:
+            self.autoplay = True
+            self.play_button.config(text="Pause")
+            self.autoplay_step()
+    
+    def stop_autoplay(self):
+        self.autoplay = False
+        self.play_button.config(text="Play")
+        if self.autoplay_job is not None:
+            self.root.after_cancel(self.autoplay_job)
+            self.autoplay_job = None
+    
+    def schedule_autoplay(self, delay):
+        # Replaces any pending step, so there is only ever one autoplay chain
+        # (a manual Next during autoplay finishes a turn and ends up here too)
+        if self.autoplay_job is not None:
+            self.root.after_cancel(self.autoplay_job)
+        self.autoplay_job = self.root.after(int(1000 * delay) + 1, self.autoplay_step)
+    
+    def autoplay_step(self):
+        self.autoplay_job = None
+        if not self.autoplay:
+            return
+        if self.move_index < len(self.solution):
+            self.apply_next_move()
+        elif self.solving:
+            # Caught up with the solver, check again once it has moved on
+            self.schedule_autoplay(0.1)
     
     def apply_next_move(self):
         if self.move_index < len(self.solution):
-            move = self.solution[self.move_index]
-            step_name = self.step_names[self.move_index]
-            self.cube.move(move)
-            self.move_label.config(text=f"Move {self.move_index + 1}/{len(self.solution)}")
-            self.step_label.config(text=f"Step: {step_name}")
-            self.move_index += 1
-            self.update_cube_display()
-            self.update_solution_label()
-            self.prev_button.config(state='normal')
-            
-            if self.move_index == len(self.solution):
-                self.next_button.config(state='disabled')
-                self.move_label.config(text="Solved!")
-                self.step_label.config(text="Completed!")
+            self.go_to_move(self.move_index + 1, animate=True)
     
     def apply_prev_move(self):
         if self.move_index > 0:
-            self.move_index -= 1
-            move = self.solution[self.move_index]
-            step_name = self.step_names[self.move_index]
-            inverse_move = self.get_inverse_move(move)
-            self.cube.move(inverse_move)
-            self.move_label.config(text=f"Move {self.move_index}/{len(self.solution)}: Undid {move}")
-            self.step_label.config(text=f"Step: {step_name}")
-            self.update_cube_display()
-            self.update_solution_label()
-            self.next_button.config(state='normal')
-            
-            if self.move_index == 0:
-                self.prev_button.config(state='disabled')
-                self.move_label.config(text="Initial state")
-                self.step_label.config(text="")
-    
-    def get_inverse_move(self, move):
-        if isinstance(move, str):
-            move = Move(move)
-        return move.reverse()
+            move = self.solution[self.move_index - 1]
+            step_name = self.step_names[self.move_index - 1]
+            self.go_to_move(self.move_index - 1, animate=True)
+            if self.move_index > 0:
+                self.move_label.config(text=f"Move {self.move_index}/{len(self.solution)}: Undid {move}")
+                self.step_label.config(text=f"Step: {step_name}")
+    
+    def jump_to_stage(self, event=None):
+        stage = self.stage_var.get()
+        if self.timeline is not None and stage:
+            self.go_to_move(self.timeline.stage_start(stage))
+    
+    def on_slider(self, value):
+        index = round(float(value))
+        if self.timeline is not None and index != self.move_index:
+            self.go_to_move(index)
     
     def update_cube_display(self):
-        self.axes.clear()
-        visualize_rubiks_cube(self.cube.to_naive_cube().get_cube(), self.axes)
-        self.canvas.draw()
+        # Geometry is built once; later updates only recolor changed stickers
+        if self.animator.running:
+            # A jump cuts the turn short without its on_done, so keep
+            # autoplay going from the new position
+            self.animator.cancel()
+            if self.autoplay:
+                self.schedule_autoplay(1 / self.speed.get())
+        cube_config = self.timeline.cube_string(self.move_index)
+        if self.renderer is None:
+            from visualize import CubeRenderer
+            self.renderer = CubeRenderer(self.axes, cube_config)
+        else:
+            self.renderer.update(cube_config)
+        self.canvas.draw_idle()
 
 def main():
     root = tk.Tk()
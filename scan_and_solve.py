@@ -0,0 +1,21 @@
+import sys
+import tkinter as tk
+
+
+def main():
+    """Scan, solve and tutor in one process and one Tk root"""
+    root = tk.Tk()
+    camera_index = sys.argv[1] if len(sys.argv) > 1 else None
+
+    def start_tutor(cube_string):
+        # Imported on handoff so scanning starts without the plotting stack
+        from rubiks_tutor import RubiksSolverGUI
+        RubiksSolverGUI(root, cube_string)
+
+    from cv_input import CubeCaptureApp
+    app = CubeCaptureApp(root, camera_index=camera_index, on_complete=start_tutor)
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
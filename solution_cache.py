@@ -0,0 +1,142 @@
+"""
+Persistent solution cache in front of rubiks_tutor.solve().
+
+Entries are keyed by the normalized 54-char cube state, so a hit returns
+exactly what solve() would. Rotated or recolored versions of a scramble
+don't share an entry: the beginner solver builds its layers around white
+on D with fixed algorithms, so conjugating a rotated cube's solution gives
+different moves, and its stage names no longer describe what the moves do.
+"""
+import json
+import sqlite3
+from collections import OrderedDict
+from rubik_solver.Move import Move
+import cube_state
+from rubiks_tutor import solve
+from cube_validation import check_cube
+
+
+class SolutionCache:
+    """
+    Bounded in-memory LRU backed by an optional SQLite file.
+
+    Args:
+        path: SQLite database path, None for a memory-only cache
+        max_size: Maximum number of entries kept in memory
+    """
+    def __init__(self, path=None, max_size=4096):
+        self.path = path
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._db = None
+        if path is not None:
+            self._db = sqlite3.connect(path)
+            self._db.execute("CREATE TABLE IF NOT EXISTS solutions (key TEXT PRIMARY KEY, moves TEXT, steps TEXT)")
+            self._db.commit()
+
+    def _key(self, cube):
+        check_cube(cube)
+        return cube_state.to_string(cube_state.from_string(cube))
+
+    def _remember(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+        if self._db is not None:
+            row = self._db.execute("SELECT moves, steps FROM solutions WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                entry = (row[0].split(), json.loads(row[1]))
+                self._remember(key, entry)
+                self.hits += 1
+                self.disk_hits += 1
+                return entry
+        self.misses += 1
+        return None
+
+    def _store(self, key, moves, step_names):
+        entry = ([str(m) for m in moves], list(step_names))
+        self._remember(key, entry)
+        if self._db is not None:
+            self._db.execute("INSERT OR REPLACE INTO solutions VALUES (?, ?, ?)",
+                             (key, ' '.join(entry[0]), json.dumps(entry[1])))
+            self._db.commit()
+
+    def get(self, cube):
+        """Return the cached (moves, step_names) for a cube string, or None"""
+        entry = self._lookup(self._key(cube))
+        if entry is None:
+            return None
+        moves, step_names = entry
+        return [Move(m) for m in moves], list(step_names)
+
+    def solve(self, cube):
+        """Same result shape as rubiks_tutor.solve(), served from the cache when possible"""
+        key = self._key(cube)
+        entry = self._lookup(key)
+        if entry is None:
+            # Not read back from the LRU, which may have evicted it already
+            moves, step_names = solve(key)
+            self._store(key, moves, step_names)
+            return moves, step_names
+        moves, step_names = entry
+        return [Move(m) for m in moves], list(step_names)
+
+    def prewarm(self, corpus_path):
+        """Solve and store every cube of a corpus file (one cube string per line), returns the count added"""
+        added = 0
+        with open(corpus_path) as corpus:
+            for line in corpus:
+                cube = line.strip()
+                if not cube or cube.startswith('#'):
+                    continue
+                key = self._key(cube)
+                if key in self._entries:
+                    continue
+                if self._db is not None and self._db.execute("SELECT 1 FROM solutions WHERE key = ?", (key,)).fetchone():
+                    continue
+                moves, step_names = solve(key)
+                self._store(key, moves, step_names)
+                added += 1
+        return added
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+        }
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+def prewarm(corpus, path):
+    """Pre-warm the SQLite cache at path from a corpus file of cube strings"""
+    cache = SolutionCache(path)
+    try:
+        added = cache.prewarm(corpus)
+    finally:
+        cache.close()
+    print(f"Added {added} solutions to {path}")
+
+
+if __name__ == '__main__':
+    import fire
+    fire.Fire(prewarm)
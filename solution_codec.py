@@ -0,0 +1,259 @@
+"""
+Compact binary encoding of solutions.
+
+A solution is stored as one byte per move (its cube_state move code) and
+its stages as (stage id, run length) pairs instead of one name per move.
+Stage names live once in a table shared by every record of a file.
+
+Record: uint16 move count, uint8 run count, uint8 flags (bit 0: the solve
+failed), run count * (uint8 stage id, uint16 length), then the move codes.
+
+File layout: b'RCSL', uint32 version, the records back to back, then a
+JSON footer {"stages": [...], "count": n}, n uint64 record offsets and a
+trailer of uint64 footer offset, uint32 footer length. Records can be
+written as they are produced; SolutionFile maps the file read-only and
+returns move codes as memoryview slices without copying. Those slices stay
+valid after SolutionFile.close(); the mapping is freed with the last one.
+
+    python solution_codec.py pack results.jsonl results.rcsl
+    python solution_codec.py show results.rcsl --index 0
+"""
+import os
+import json
+import mmap
+import struct
+import fire
+from rubik_solver.Move import Move
+import cube_state
+
+MAGIC = b'RCSL'
+VERSION = 1
+FAILED = 1
+
+_RECORD = struct.Struct('<HBB')
+_RUN = struct.Struct('<BH')
+_TRAILER = struct.Struct('<QI')
+
+
+def _runs(step_names):
+    runs = []
+    for name in step_names:
+        if runs and runs[-1][0] == name:
+            runs[-1][1] += 1
+        else:
+            runs.append([name, 1])
+    return runs
+
+
+def pack(moves, step_names, stages, failed=False):
+    """
+    Encode one solution as a record
+    Args:
+        moves: Move objects or move strings
+        step_names: Stage name of each move
+        stages: Dict of stage name -> id, extended with any new names
+        failed: Mark the record as a failed solve (moves must be empty)
+    Returns:
+        bytes
+    """
+    if len(moves) != len(step_names):
+        raise ValueError("moves and step_names must have the same length")
+    if len(moves) > 0xffff:
+        raise ValueError(f"Solutions are limited to 65535 moves, got {len(moves)}")
+    runs = _runs(step_names)
+    if len(runs) > 0xff:
+        raise ValueError(f"Solutions are limited to 255 stage runs, got {len(runs)}")
+    parts = [_RECORD.pack(len(moves), len(runs), FAILED if failed else 0)]
+    for name, length in runs:
+        if name not in stages:
+            if len(stages) > 0xff:
+                raise ValueError("At most 256 distinct stage names can be encoded")
+            stages[name] = len(stages)
+        parts.append(_RUN.pack(stages[name], length))
+    parts.append(cube_state.move_codes(moves).tobytes())
+    return b''.join(parts)
+
+
+def _read_header(buffer, offset):
+    n_moves, n_runs, flags = _RECORD.unpack_from(buffer, offset)
+    runs_start = offset + _RECORD.size
+    codes_start = runs_start + n_runs * _RUN.size
+    runs = [_RUN.unpack_from(buffer, runs_start + i * _RUN.size) for i in range(n_runs)]
+    return runs, codes_start, codes_start + n_moves, flags
+
+
+def unpack(buffer, offset, stage_names, as_strings=False):
+    """
+    Decode the record at offset
+    Returns:
+        ((moves, step_names) or None for a failed solve, offset of the next record)
+    """
+    runs, start, end, flags = _read_header(buffer, offset)
+    if flags & FAILED:
+        return None, end
+    names = [cube_state.MOVE_NAMES[code] for code in bytes(buffer[start:end])]
+    moves = names if as_strings else [Move(name) for name in names]
+    step_names = []
+    for stage_id, length in runs:
+        step_names += [stage_names[stage_id]] * length
+    return (moves, step_names), end
+
+
+class SolutionWriter:
+    """Streams records to a solution file, use as a context manager"""
+    def __init__(self, path):
+        self._file = open(path, 'wb')
+        self._file.write(MAGIC + struct.pack('<I', VERSION))
+        self._offset = len(MAGIC) + 4
+        self._offsets = []
+        self.stages = {}
+
+    def write(self, moves, step_names, failed=False):
+        record = pack(moves, step_names, self.stages, failed)
+        self._file.write(record)
+        self._offsets.append(self._offset)
+        self._offset += len(record)
+
+    def write_failed(self):
+        self.write([], [], failed=True)
+
+    def close(self):
+        if self._file.closed:
+            return
+        stage_names = sorted(self.stages, key=self.stages.get)
+        footer = json.dumps({'stages': stage_names, 'count': len(self._offsets)}).encode('utf-8')
+        self._file.write(footer)
+        self._file.write(struct.pack(f'<{len(self._offsets)}Q', *self._offsets))
+        self._file.write(_TRAILER.pack(self._offset, len(footer)))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SolutionFile:
+    """
+    Random access to a solution file, or to the same bytes already in memory.
+    Views returned by codes() keep the mapping alive, so close() never fails
+    while they exist; release them (or drop them) to unmap the file
+    Args:
+        source: Path to map read-only, or any bytes-like object
+    """
+    def __init__(self, source):
+        self._mmap = None
+        if isinstance(source, str):
+            with open(source, 'rb') as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            source = self._mmap
+        self._view = memoryview(source)
+        if bytes(self._view[:4]) != MAGIC or struct.unpack_from('<I', self._view, 4)[0] != VERSION:
+            raise ValueError(f"Not a version {VERSION} solution file")
+        footer_offset, footer_length = _TRAILER.unpack_from(self._view, len(self._view) - _TRAILER.size)
+        footer = json.loads(bytes(self._view[footer_offset:footer_offset + footer_length]))
+        self.stage_names = footer['stages']
+        index_start = footer_offset + footer_length
+        self._offsets = self._view[index_start:index_start + 8 * footer['count']].cast('Q')
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __getitem__(self, index):
+        """(moves, step_names) of a record, None if that solve failed"""
+        return unpack(self._view, self._offsets[index], self.stage_names)[0]
+
+    def __iter__(self):
+        for offset in self._offsets:
+            yield unpack(self._view, offset, self.stage_names)[0]
+
+    def strings(self, index):
+        """Like indexing, with moves as strings"""
+        return unpack(self._view, self._offsets[index], self.stage_names, as_strings=True)[0]
+
+    def codes(self, index):
+        """
+        Move codes of a record as a zero-copy memoryview of uint8, valid
+        until released, even after close()
+        """
+        _, start, end, _ = _read_header(self._view, self._offsets[index])
+        return self._view[start:end]
+
+    def runs(self, index):
+        """[(stage name, number of moves)] of a record"""
+        runs, _, _, _ = _read_header(self._view, self._offsets[index])
+        return [(self.stage_names[stage_id], length) for stage_id, length in runs]
+
+    def failed(self, index):
+        return bool(_read_header(self._view, self._offsets[index])[3] & FAILED)
+
+    def close(self):
+        self._offsets.release()
+        self._view.release()
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # codes() views are still alive; the mmap is unmapped when
+                # the last of them is released
+                pass
+            self._mmap = None
+
+
+def pack_results(jsonl_path, out_path):
+    """
+    Convert batch_solve.py JSON lines into a solution file, in input order.
+    Results are streamed; only those that arrive ahead of their index
+    (unordered batch_solve output) are held until their turn. The file is
+    written next to out_path and only renamed into place once every index
+    is packed, so a failure never leaves a valid-looking partial file
+    """
+    partial = out_path + '.partial'
+    ahead = {}
+    count = 0
+    writer = SolutionWriter(partial)
+    try:
+        with open(jsonl_path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                result = json.loads(line)
+                ahead[result['index']] = result
+                while count in ahead:
+                    result = ahead.pop(count)
+                    if 'error' in result:
+                        writer.write_failed()
+                    else:
+                        writer.write(result['moves'], result['steps'])
+                    count += 1
+        if ahead:
+            raise ValueError(f"{jsonl_path} has no result for index {count}, "
+                             f"{len(ahead)} later result(s) were not packed")
+        writer.close()
+        os.replace(partial, out_path)
+    except BaseException:
+        writer.close()
+        os.remove(partial)
+        raise
+    print(f"Packed {count} solutions into {out_path}")
+
+
+def show(path, index=0):
+    """Print one solution of a solution file"""
+    solutions = SolutionFile(path)
+    try:
+        solution = solutions.strings(index)
+        if solution is None:
+            print(f"Solution {index} of {len(solutions)} failed")
+        else:
+            print(f"Solution {index} of {len(solutions)}: {len(solution[0])} moves")
+            for stage, length in solutions.runs(index):
+                print(f"  {stage}: {length}")
+            print(' '.join(solution[0]))
+    finally:
+        solutions.close()
+
+
+if __name__ == '__main__':
+    fire.Fire({'pack': pack_results, 'show': show})
@@ -0,0 +1,70 @@
+import numpy as np
+import cube_state
+
+
+class SolutionTimeline:
+    """
+    Every facelet state of a solution, precomputed once.
+
+    States live in one contiguous (len(moves) + 1, 54) uint8 buffer, so
+    state i is the cube after the first i moves and any step, stage start
+    or slider position is a constant-time lookup instead of a move replay.
+    """
+    def __init__(self, cube, moves, step_names):
+        if len(moves) != len(step_names):
+            raise ValueError("moves and step_names must have the same length")
+        self.moves = []
+        self.step_names = []
+        self.stages = []  # (stage name, index of its first move), in solution order
+
+        initial = cube_state.from_string(cube) if isinstance(cube, str) else np.asarray(cube, dtype=np.uint8)
+        self.states = initial.reshape(1, 54).copy()
+        self.extend(moves, step_names)
+
+    def extend(self, moves, step_names):
+        """Append moves, e.g. the next stage of a solution that is still being computed"""
+        if len(moves) != len(step_names):
+            raise ValueError("moves and step_names must have the same length")
+        codes = cube_state.move_codes(moves)
+        start = len(self.moves)
+        states = np.empty((start + len(codes) + 1, 54), dtype=np.uint8)
+        states[:start + 1] = self.states
+        for i, code in enumerate(codes, start):
+            states[i + 1] = states[i][cube_state.PERMS[code]]
+        self.states = states
+
+        for i, name in enumerate(step_names, start):
+            if not self.stages or self.stages[-1][0] != name:
+                self.stages.append((name, i))
+        self.moves += list(moves)
+        self.step_names += list(step_names)
+
+    def __len__(self):
+        return len(self.moves)
+
+    @property
+    def buffer(self):
+        """Raw bytes of all states, 54 per step"""
+        return self.states.data
+
+    def state(self, index):
+        return self.states[index]
+
+    def cube_string(self, index):
+        return cube_state.to_string(self.states[index])
+
+    def stage_names(self):
+        return [name for name, _ in self.stages]
+
+    def stage_start(self, name):
+        """Index of the state right before the first move of a stage"""
+        for stage, start in self.stages:
+            if stage == name:
+                return start
+        raise KeyError(name)
+
+    def stage_at(self, index):
+        """Stage of the move that produced state index, None for the initial state"""
+        if index <= 0:
+            return None
+        return self.step_names[index - 1]
@@ -0,0 +1,124 @@
+"""
+Vectorized check that solutions really solve their cubes.
+
+All cubes are replayed together as one (N, 54) uint8 array: step t gathers
+every row through the permutation of its own t-th move, and shorter
+sequences are padded with an identity permutation, so the cost is one
+gather per move of the longest solution rather than one Cubie.Cube replay
+per cube. For beginner method solutions the state at the end of each stage
+is also checked against that stage's goal, which tells where a failing
+solution went wrong.
+"""
+import numpy as np
+import cube_state
+
+# cube_state.PERMS plus an identity row used to pad ragged sequences
+_PERMS = np.vstack([cube_state.PERMS, np.arange(54, dtype=np.uint8)])
+PAD = cube_state.N_MOVES
+
+_U, _D = 0, 45
+_SIDES = (9, 18, 27, 36)
+_CENTERS = [4, 13, 22, 31, 40, 49]
+
+
+def _stage_goals():
+    # Facelets that must match their face's center once each stage is done.
+    # White ends up on D, so the layers fill from the bottom row up
+    cross = _CENTERS + [_D + i for i in (1, 3, 5, 7)] + [s + 7 for s in _SIDES]
+    side = cross + [_D + i for i in (0, 2, 6, 8)] + [s + i for s in _SIDES for i in (6, 8)]
+    second = side + [s + i for s in _SIDES for i in (3, 5)]
+    yellow_cross = second + [_U + i for i in (1, 3, 5, 7)]
+    return [
+        ('White Cross', cross),
+        ('White Side', side),
+        ('Second Layer', second),
+        ('Yellow Cross', yellow_cross),
+        ('Yellow Face', list(range(54))),
+    ]
+
+
+STAGE_GOALS = [(name, np.array(sorted(set(goal)))) for name, goal in _stage_goals()]
+_STAGE_INDEX = {name: i for i, (name, _) in enumerate(STAGE_GOALS)}
+
+
+def _pad_codes(move_lists):
+    length = max((len(moves) for moves in move_lists), default=0)
+    codes = np.full((len(move_lists), length), PAD, dtype=np.uint8)
+    for row, moves in enumerate(move_lists):
+        codes[row, :len(moves)] = cube_state.move_codes(moves)
+    return codes
+
+
+def _meets(states, goal):
+    # Compare against the current centers, whole-cube rotations move them
+    centers = states[:, _CENTERS]
+    return (states[:, goal] == centers[:, goal // 9]).all(axis=1)
+
+
+def verify_batch(cubes, solutions):
+    """
+    Replay many solutions at once
+    Args:
+        cubes: Cube strings, or an (N, 54) facelet array
+        solutions: (moves, step_names) per cube; moves as Move objects or strings
+    Returns:
+        (solved, diverged): (N,) bool array of cubes that end solved, and per
+        cube None or the first stage whose goal was not met. Stages that
+        aren't beginner method stages have no goal, so a failure there is
+        reported at the last stage of the solution
+    """
+    states = cube_state.from_strings(cubes) if not isinstance(cubes, np.ndarray) else cubes.copy()
+    if len(states) != len(solutions):
+        raise ValueError("cubes and solutions must have the same length")
+    codes = _pad_codes([moves for moves, _ in solutions])
+
+    # Number of moves into each solution at which each known stage has ended
+    ends = np.full((len(STAGE_GOALS), len(solutions)), -1, dtype=np.int64)
+    for row, (_, step_names) in enumerate(solutions):
+        stage_ids = [_STAGE_INDEX.get(name, -1) for name in step_names]
+        if step_names and -1 not in stage_ids:
+            stage_ids = np.array(stage_ids)
+            ends[:, row] = [(stage_ids <= k).sum() for k in range(len(STAGE_GOALS))]
+
+    checkpoints = {}
+    for k in range(len(STAGE_GOALS)):
+        for t in np.unique(ends[k][ends[k] >= 0]):
+            checkpoints.setdefault(int(t), []).append((k, np.nonzero(ends[k] == t)[0]))
+
+    failed_stage = np.full(len(solutions), -1, dtype=np.int64)
+
+    def check(t):
+        for k, rows in checkpoints.get(t, ()):
+            missed = rows[~_meets(states[rows], STAGE_GOALS[k][1]) & (failed_stage[rows] < 0)]
+            failed_stage[missed] = k
+
+    check(0)
+    for t in range(codes.shape[1]):
+        states = np.take_along_axis(states, _PERMS[codes[:, t]], axis=1)
+        check(t + 1)
+
+    solved = cube_state.is_solved(states)
+    diverged = []
+    for row, (_, step_names) in enumerate(solutions):
+        if solved[row] and failed_stage[row] < 0:
+            diverged.append(None)
+        elif failed_stage[row] >= 0:
+            diverged.append(STAGE_GOALS[failed_stage[row]][0])
+        else:
+            diverged.append(step_names[-1] if step_names else None)
+    return solved, diverged
+
+
+def verify_results(results):
+    """
+    Add 'verified' (and 'diverged_stage' when false) to batch_solve result
+    dicts in place; results with an 'error' are left alone
+    """
+    results = [r for r in results if 'error' not in r]
+    if not results:
+        return
+    solved, diverged = verify_batch([r['cube'] for r in results], [(r['moves'], r['steps']) for r in results])
+    for result, ok, stage in zip(results, solved, diverged):
+        result['verified'] = bool(ok and stage is None)
+        if not result['verified']:
+            result['diverged_stage'] = stage
@@ -0,0 +1,219 @@
+"""
+Local HTTP/JSON solving service, so other processes can use the solver
+without starting Tk.
+
+    python solve_service.py --port 8765 --workers 4 --max_pending 64
+
+    POST /solve    {"cube": "<54 chars>", "method": "beginner", "simplify": false}
+                   -> {"moves": [...], "steps": [...]}
+    GET  /health   -> {"status": "ok", ...}
+    GET  /metrics  -> Prometheus text format
+
+Solves run in a process pool. At most max_pending distinct cubes are
+queued or running; beyond that requests get 503 with Retry-After instead
+of piling up. Concurrent requests for the same cube state (and options)
+share a single computation.
+"""
+import json
+import time
+import signal
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import fire
+import cube_state
+from process_pool import resolve_workers
+
+MAX_BODY = 64 * 1024
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            413: 'Payload Too Large', 503: 'Service Unavailable'}
+
+
+def _solve_in_worker(cube, method, simplify):
+    # Imported in the worker so the server process stays light
+    from rubiks_tutor import solve
+    moves, step_names = solve(cube, simplify=simplify, method=method)
+    return [str(m) for m in moves], list(step_names)
+
+
+class Overloaded(Exception):
+    pass
+
+
+class SolveService:
+    """
+    Coalescing front end to a process pool
+    Args:
+        workers: Number of worker processes, None for os.cpu_count()
+        max_pending: Maximum number of distinct solves queued or running
+    """
+    def __init__(self, workers=None, max_pending=64):
+        self.workers = resolve_workers(workers)
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        self.max_pending = max_pending
+        self._inflight = {}
+        self.started = time.time()
+        self.requests = 0
+        self.solved = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.failed = 0
+        self.solve_seconds = 0.0
+
+    @staticmethod
+    def _key(cube, method, simplify):
+        # Normalize so equivalent spellings of a state coalesce
+        return cube_state.to_string(cube_state.from_string(cube)), method, bool(simplify)
+
+    async def solve(self, cube, method='beginner', simplify=False):
+        """Return (moves, step_names) as strings; raises Overloaded when the queue is full"""
+        self.requests += 1
+        key = self._key(cube, method, simplify)
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+        if len(self._inflight) >= self.max_pending:
+            self.rejected += 1
+            raise Overloaded(f"{len(self._inflight)} solves pending")
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, _solve_in_worker, *key)
+        self._inflight[key] = future
+        start = time.perf_counter()
+        # Bookkeeping happens when the solve finishes, even if every client
+        # waiting on it has gone away in the meantime
+        future.add_done_callback(lambda f: self._finished(key, f, start))
+        return await asyncio.shield(future)
+
+    def _finished(self, key, future, start):
+        del self._inflight[key]
+        self.solve_seconds += time.perf_counter() - start
+        if future.cancelled() or future.exception() is not None:
+            self.failed += 1
+        else:
+            self.solved += 1
+
+    def health(self):
+        return {
+            'status': 'ok',
+            'workers': self.workers,
+            'pending': len(self._inflight),
+            'max_pending': self.max_pending,
+            'uptime_s': round(time.time() - self.started, 3),
+        }
+
+    def metrics(self, prefix='rubiks_service'):
+        values = [
+            ('requests_total', 'counter', self.requests),
+            ('solves_total', 'counter', self.solved),
+            ('coalesced_total', 'counter', self.coalesced),
+            ('rejected_total', 'counter', self.rejected),
+            ('failed_total', 'counter', self.failed),
+            ('solve_seconds_total', 'counter', self.solve_seconds),
+            ('pending', 'gauge', len(self._inflight)),
+            ('max_pending', 'gauge', self.max_pending),
+            ('workers', 'gauge', self.workers),
+        ]
+        lines = []
+        for name, kind, value in values:
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            lines.append(f"{prefix}_{name} {value}")
+        return '\n'.join(lines) + '\n'
+
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
+
+    async def handle_solve(self, body):
+        try:
+            request = json.loads(body or b'{}')
+            cube = request['cube']
+        except (ValueError, KeyError, TypeError):
+            return 400, {'error': 'Expected a JSON object with a "cube" string'}
+        try:
+            moves, steps = await self.solve(cube, request.get('method', 'beginner'), request.get('simplify', False))
+        except Overloaded as e:
+            return 503, {'error': f"Overloaded: {e}"}
+        except Exception as e:
+            return 400, {'error': f"{type(e).__name__}: {e}"}
+        return 200, {'moves': moves, 'steps': steps}
+
+    async def handle_connection(self, reader, writer):
+        # Minimal HTTP/1.1 with keep-alive, enough for local clients
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                if length > MAX_BODY:
+                    await self._respond(writer, 413, {'error': 'Request body too large'}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+                keep_alive = headers.get('connection', '').lower() != 'close'
+
+                path = path.split('?', 1)[0]
+                if path == '/solve':
+                    status, payload = await self.handle_solve(body) if method == 'POST' else (405, {'error': 'Use POST'})
+                elif path == '/health':
+                    status, payload = 200, self.health()
+                elif path == '/metrics':
+                    status, payload = 200, self.metrics()
+                else:
+                    status, payload = 404, {'error': f"No route for {path}"}
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, payload, keep_alive=True):
+        if isinstance(payload, str):
+            body, content_type = payload.encode('utf-8'), 'text/plain; version=0.0.4'
+        else:
+            body, content_type = json.dumps(payload).encode('utf-8'), 'application/json'
+        head = [f"HTTP/1.1 {status} {_REASONS[status]}",
+                f"Content-Type: {content_type}",
+                f"Content-Length: {len(body)}",
+                f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        if status == 503:
+            head.append("Retry-After: 1")
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+
+
+async def serve(host='127.0.0.1', port=8765, workers=None, max_pending=64):
+    service = SolveService(workers, max_pending)
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    print(f"Serving on http://{host}:{port} with {service.workers} workers", flush=True)
+    # Stop cleanly on SIGTERM too, otherwise the pool workers are orphaned
+    loop = asyncio.get_running_loop()
+    task = asyncio.current_task()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, task.cancel)
+    try:
+        async with server:
+            await server.serve_forever()
+    except asyncio.CancelledError:
+        pass
+    finally:
+        service.close()
+
+
+def main(host='127.0.0.1', port=8765, workers=None, max_pending=64):
+    """Run the solving service"""
+    asyncio.run(serve(host, port, workers, max_pending))
+
+
+if __name__ == '__main__':
+    fire.Fire(main)
@@ -0,0 +1,53 @@
+import random
+import pytest
+from benchmark import generate_corpus
+from cube_validation import CubeValidationError
+from rubiks_tutor import solve
+from solution_cache import SolutionCache
+
+
+def _corrupted(seed):
+    cube = list(generate_corpus(1, seed)[0])
+    # Swap two stickers of different colors, away from the centers
+    rng = random.Random(seed)
+    a, b = rng.sample([i for i in range(54) if i % 9 != 4], 2)
+    while cube[a] == cube[b]:
+        b = rng.choice([i for i in range(54) if i % 9 != 4])
+    cube[a], cube[b] = cube[b], cube[a]
+    return ''.join(cube)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_errors_match_direct_solve(seed):
+    cube = _corrupted(seed)
+    with pytest.raises(CubeValidationError) as direct:
+        solve(cube)
+    cache = SolutionCache()
+    for method in (cache.solve, cache.get):
+        with pytest.raises(CubeValidationError) as cached:
+            method(cube)
+        assert str(cached.value) == str(direct.value)
+
+
+def test_cached_solve_matches_solve(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    cubes = generate_corpus(5, seed=2)
+    cache = SolutionCache(path)
+    expected = [solve(cube) for cube in cubes]
+    for _ in range(2):  # a miss, then a hit from memory
+        for cube, (moves, step_names) in zip(cubes, expected):
+            assert cache.solve(cube) == (moves, step_names)
+    cache.close()
+    # and a hit from disk
+    cache = SolutionCache(path)
+    for cube, (moves, step_names) in zip(cubes, expected):
+        assert cache.solve(cube) == (moves, step_names)
+    assert cache.disk_hits == len(cubes)
+    cache.close()
+
+
+def test_zero_size_cache_still_solves():
+    cube = generate_corpus(1, seed=4)[0]
+    cache = SolutionCache(max_size=0)
+    assert cache.solve(cube) == solve(cube)
+    assert cache.stats()['size'] == 0
@@ -0,0 +1,40 @@
+from benchmark import generate_corpus
+from solution_cache import SolutionCache
+from solution_verifier import verify_results
+
+
+def _cached_results(cubes):
+    cache = SolutionCache()
+    results = []
+    for index, cube in enumerate(cubes):
+        moves, step_names = cache.solve(cube)
+        results.append({'index': index, 'cube': cube, 'moves': [str(m) for m in moves], 'steps': step_names})
+    return results
+
+
+def test_cached_solutions_verify():
+    results = _cached_results(generate_corpus(12))
+    verify_results(results)
+    assert [r.get('diverged_stage') for r in results if not r['verified']] == []
+
+
+def test_stage_goals_are_white_on_d():
+    # A cross built on another face is not the white cross
+    result = _cached_results(generate_corpus(1, seed=1))[0]
+    cross = result['steps'].count('White Cross')
+    for move in ('X', 'X'):
+        result['moves'].insert(cross, move)
+        result['steps'].insert(cross, 'White Cross')
+    verify_results([result])
+    assert result['diverged_stage'] == 'White Cross'
+
+
+def test_broken_solution_reports_stage():
+    result = _cached_results(generate_corpus(1, seed=1))[0]
+    # An extra quarter turn at the end of the cross breaks it
+    cross = result['steps'].count('White Cross')
+    result['moves'].insert(cross, 'R')
+    result['steps'].insert(cross, 'White Cross')
+    verify_results([result])
+    assert not result['verified']
+    assert result['diverged_stage'] == 'White Cross'
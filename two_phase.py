@@ -0,0 +1,265 @@
+"""
+Two-phase (Kociemba) solver backed by memory-mapped tables.
+
+rubik_solver ships the move and pruning tables as CSV text that is parsed
+into Python lists on every import of rubik_solver.CoordCube, which takes
+seconds and lives separately in every process. generate_tables() converts
+them once into a single binary file; load_tables() maps that file
+read-only, so loading is near instant and worker processes share the same
+page cache.
+
+File layout: b'RCTP', uint32 version, uint32 header length, a JSON header
+of {name: [typecode, rows, cols, offset]}, then the raw little-endian
+tables, each aligned to 64 bytes.
+"""
+import os
+import sys
+import mmap
+import json
+import time
+import struct
+from rubik_solver.Solver import Solver
+from rubik_solver.NaiveCube import NaiveCube
+from rubik_solver.Move import Move
+
+MAGIC = b'RCTP'
+VERSION = 1
+TABLES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'two_phase_tables.bin')
+
+N_MOVE = 18
+N_SLICE1 = 495
+N_SLICE2 = 24
+
+# (name in the file, attribute of rubik_solver's CoordCube, array typecode)
+_TABLES = [
+    ('twist_move', 'twistMove', 'H'),
+    ('flip_move', 'flipMove', 'H'),
+    ('fr_to_br_move', 'FRtoBR_Move', 'H'),
+    ('urf_to_dlf_move', 'URFtoDLF_Move', 'H'),
+    ('ur_to_df_move', 'URtoDF_Move', 'I'),
+    ('ur_to_ul_move', 'URtoUL_Move', 'H'),
+    ('ub_to_df_move', 'UBtoDF_Move', 'H'),
+    ('merge_ur_to_ul_and_ub_to_df', 'MergeURtoULandUBtoDF', 'h'),
+    ('slice_urf_to_dlf_parity_prun', 'Slice_URFtoDLF_Parity_Prun', 'B'),
+    ('slice_ur_to_df_parity_prun', 'Slice_URtoDF_Parity_Prun', 'B'),
+    ('slice_twist_prun', 'Slice_Twist_Prun', 'B'),
+    ('slice_flip_prun', 'Slice_Flip_Prun', 'B'),
+]
+
+PARITY_MOVE = (
+    (1, 0, 1, 1, 0, 1, 1, 0, 1, 1, 0, 1, 1, 0, 1, 1, 0, 1),
+    (0, 1, 0, 0, 1, 0, 0, 1, 0, 0, 1, 0, 0, 1, 0, 0, 1, 0),
+)
+
+# Moves that keep a cube inside the phase 2 subgroup: U*, D*, R2, F2, L2, B2
+PHASE2_MOVES = (0, 1, 2, 9, 10, 11, 4, 7, 13, 16)
+
+_AXIS_NAMES = 'URFDLB'
+_POWER_SUFFIX = ('', '2', "'")
+
+
+class NoSolution(Exception):
+    pass
+
+
+def generate_tables(path=TABLES_PATH):
+    """Build (or read) rubik_solver's Kociemba tables and write them as one binary file"""
+    from array import array
+    start = time.time()
+    from rubik_solver.CoordCube import CoordCube
+    print(f"Loaded rubik_solver tables in {time.time() - start:.1f}s")
+
+    header = {}
+    blobs = []
+    offset = 0
+    for name, attribute, typecode in _TABLES:
+        table = getattr(CoordCube, attribute)
+        if isinstance(table[0], list):
+            rows, cols = len(table), len(table[0])
+            flat = [v for row in table for v in row]
+        else:
+            rows, cols = len(table), 1
+            # Untouched pruning bytes are stored as -1
+            flat = [v & 0xff for v in table]
+        data = array(typecode, flat)
+        if sys.byteorder != 'little':
+            data.byteswap()
+        offset = (offset + 63) // 64 * 64
+        header[name] = [typecode, rows, cols, offset]
+        blobs.append((offset, data.tobytes()))
+        offset += len(blobs[-1][1])
+
+    header_bytes = json.dumps(header).encode('utf-8')
+    base = 12 + len(header_bytes)
+    base = (base + 63) // 64 * 64
+    with open(path, 'wb') as f:
+        f.write(MAGIC + struct.pack('<II', VERSION, len(header_bytes)) + header_bytes)
+        for table_offset, blob in blobs:
+            f.seek(base + table_offset)
+            f.write(blob)
+    print(f"Wrote {os.path.getsize(path)} bytes to {path}")
+
+
+class Tables:
+    """Read-only views over a memory-mapped table file"""
+    def __init__(self, path=TABLES_PATH):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} not found, run 'python two_phase.py --generate' first")
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        version, header_length = struct.unpack_from('<II', self._mmap, 4)
+        if self._mmap[:4] != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} two-phase table file")
+        header = json.loads(self._mmap[12:12 + header_length])
+        base = (12 + header_length + 63) // 64 * 64
+        view = memoryview(self._mmap)
+        for name, (typecode, rows, cols, offset) in header.items():
+            size = rows * cols * struct.calcsize(typecode)
+            start = base + offset
+            setattr(self, name, view[start:start + size].cast(typecode))
+
+
+_tables = None
+
+
+def load_tables(path=TABLES_PATH):
+    global _tables
+    if _tables is None:
+        _tables = Tables(path)
+    return _tables
+
+
+def _prun(table, index):
+    if index & 1:
+        return table[index >> 1] >> 4
+    return table[index >> 1] & 0x0f
+
+
+class _Search:
+    def __init__(self, tables, facelets, max_depth, timeout):
+        from rubik_solver.FaceCube import FaceCube
+        cc = FaceCube(facelets).toCubieCube()
+        cc.verify()
+        self.t = tables
+        self.max_depth = max_depth
+        self.deadline = time.time() + timeout
+        self.twist = cc.getTwist()
+        self.flip = cc.getFlip()
+        self.parity = cc.cornerParity()
+        self.fr_to_br = cc.getFRtoBR()
+        self.urf_to_dlf = cc.getURFtoDLF()
+        self.ur_to_ul = cc.getURtoUL()
+        self.ub_to_df = cc.getUBtoDF()
+        self.path = []
+        self.phase1_length = 0
+
+    def run(self):
+        flip, twist, slice_ = self.flip, self.twist, self.fr_to_br // 24
+        h = max(_prun(self.t.slice_flip_prun, N_SLICE1 * flip + slice_),
+                _prun(self.t.slice_twist_prun, N_SLICE1 * twist + slice_))
+        for depth in range(h, self.max_depth + 1):
+            if self._phase1(flip, twist, slice_, h, depth):
+                return self.path, self.phase1_length
+        raise NoSolution(f"No solution within {self.max_depth} moves")
+
+    def _phase1(self, flip, twist, slice_, h, togo):
+        if togo == 0:
+            if h == 0 and (not self.path or self.path[-1] not in PHASE2_MOVES):
+                return self._start_phase2()
+            return False
+        if time.time() > self.deadline:
+            raise TimeoutError("Two-phase search timed out")
+        t = self.t
+        flip_move, twist_move, fr_to_br_move = t.flip_move, t.twist_move, t.fr_to_br_move
+        flip_prun, twist_prun = t.slice_flip_prun, t.slice_twist_prun
+        last_axis = self.path[-1] // 3 if self.path else -1
+        togo -= 1
+        for m in range(N_MOVE):
+            axis = m // 3
+            if axis == last_axis or axis == last_axis - 3:
+                continue
+            # Prune children here rather than in the callee to save the call
+            new_slice = fr_to_br_move[slice_ * 24 * N_MOVE + m] // 24
+            new_flip = flip_move[flip * N_MOVE + m]
+            index = N_SLICE1 * new_flip + new_slice
+            h_flip = (flip_prun[index >> 1] >> 4) if index & 1 else (flip_prun[index >> 1] & 0x0f)
+            if h_flip > togo:
+                continue
+            new_twist = twist_move[twist * N_MOVE + m]
+            index = N_SLICE1 * new_twist + new_slice
+            h_twist = (twist_prun[index >> 1] >> 4) if index & 1 else (twist_prun[index >> 1] & 0x0f)
+            if h_twist > togo:
+                continue
+            self.path.append(m)
+            if self._phase1(new_flip, new_twist, new_slice, max(h_flip, h_twist), togo):
+                return True
+            self.path.pop()
+        return False
+
+    def _start_phase2(self):
+        t = self.t
+        urf_to_dlf, fr_to_br, parity = self.urf_to_dlf, self.fr_to_br, self.parity
+        ur_to_ul, ub_to_df = self.ur_to_ul, self.ub_to_df
+        for m in self.path:
+            urf_to_dlf = t.urf_to_dlf_move[urf_to_dlf * N_MOVE + m]
+            fr_to_br = t.fr_to_br_move[fr_to_br * N_MOVE + m]
+            parity = PARITY_MOVE[parity][m]
+            ur_to_ul = t.ur_to_ul_move[ur_to_ul * N_MOVE + m]
+            ub_to_df = t.ub_to_df_move[ub_to_df * N_MOVE + m]
+        ur_to_df = t.merge_ur_to_ul_and_ub_to_df[ur_to_ul * 336 + ub_to_df]
+        self.phase1_length = len(self.path)
+        max_phase2 = min(10, self.max_depth - len(self.path))
+        for depth in range(max_phase2 + 1):
+            if self._phase2(urf_to_dlf, fr_to_br, parity, ur_to_df, depth):
+                return True
+        return False
+
+    def _phase2(self, urf_to_dlf, fr_to_br, parity, ur_to_df, togo):
+        t = self.t
+        h = max(_prun(t.slice_urf_to_dlf_parity_prun, (N_SLICE2 * urf_to_dlf + fr_to_br) * 2 + parity),
+                _prun(t.slice_ur_to_df_parity_prun, (N_SLICE2 * ur_to_df + fr_to_br) * 2 + parity))
+        if h == 0:
+            return True
+        if h > togo:
+            return False
+        last_axis = self.path[-1] // 3 if self.path else -1
+        for m in PHASE2_MOVES:
+            axis = m // 3
+            if axis == last_axis or axis == last_axis - 3:
+                continue
+            self.path.append(m)
+            if self._phase2(t.urf_to_dlf_move[urf_to_dlf * N_MOVE + m], t.fr_to_br_move[fr_to_br * N_MOVE + m],
+                            PARITY_MOVE[parity][m], t.ur_to_df_move[ur_to_df * N_MOVE + m], togo - 1):
+                return True
+            self.path.pop()
+        return False
+
+
+class TwoPhaseSolver(Solver):
+    def solution(self, max_depth=24, timeout=30, tables_path=TABLES_PATH):
+        facelets = self.cube.to_naive_cube().to_face_cube().to_String()
+        path, phase1_length = _Search(load_tables(tables_path), facelets, max_depth, timeout).run()
+        moves = [Move(_AXIS_NAMES[m // 3] + _POWER_SUFFIX[m % 3]) for m in path]
+        step_name = ['Phase 1'] * phase1_length + ['Phase 2'] * (len(moves) - phase1_length)
+        return moves, step_name
+
+
+def main(cube_string=None, path=TABLES_PATH, generate=False):
+    """Generate the table file with --generate, or solve a cube string"""
+    if generate:
+        generate_tables(path)
+        return
+    naive = NaiveCube()
+    naive.set_cube(cube_string)
+    from rubik_solver.Cubie import Cube
+    cube = Cube()
+    cube.from_naive_cube(naive)
+    start = time.time()
+    moves, _ = TwoPhaseSolver(cube).solution(tables_path=path)
+    print(' '.join(str(m) for m in moves))
+    print(f"{len(moves)} moves in {time.time() - start:.3f}s")
+
+
+if __name__ == '__main__':
+    import fire
+    fire.Fire(main)
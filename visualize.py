@@ -1,36 +1,32 @@
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d.art3d import Poly3DCollection
-import fire
+"""
+Cube renderers for the 54-char cube_config layout (faces ULFRBD).
 
+visualize_rubiks_cube and CubeRenderer draw the interactive 3D view with
+matplotlib, imported only when they are used; CubeRenderer.turn() with
+layer_turn() draws a layer part way through a move. render_net(s) and
+net_svg(s) draw the unfolded net straight into a NumPy RGB buffer or an SVG
+string, which is much cheaper for thumbnails and service responses.
+"""
+from functools import lru_cache
+import numpy as np
 
-def visualize_rubiks_cube(cube_config, ax=None):
-    if len(cube_config) != 54:
-        raise ValueError("The cube configuration must be exactly 54 characters long.")
 
-    if ax is None:
-        fig = plt.figure()
-        ax = fig.add_subplot(111, projection='3d')
+# Define color mapping
+COLOR_MAP = {
+    'w': 'white',
+    'y': 'yellow',
+    'r': 'red',
+    'o': 'orange',
+    'g': 'green',
+    'b': 'blue'
+}
 
-    # Define color mapping
-    color_map = {
-        'w': 'white',
-        'y': 'yellow',
-        'r': 'red',
-        'o': 'orange',
-        'g': 'green',
-        'b': 'blue'
-    }
-
-    # Define the faces of the 3x3 Rubik's cube
+
+def _sticker_quads():
+    # Define the faces of the 3x3 Rubik's cube, one quad per sticker in
+    # cube_config order: top, left, front, right, back, bottom
     faces = []
-    face_colors = []
-    
-    # Define the order of faces: top, left, front, right, back, bottom
-    face_order = [0, 1, 2, 3, 4, 5]
-    face_ranges = [(0, 9), (9, 18), (18, 27), (27, 36), (36, 45), (45, 54)]
-
-    for face_idx, (start, end) in zip(face_order, face_ranges):
-        face_config = cube_config[start:end]
+    for face_idx in range(6):
         for i in range(3):
             for j in range(3):
                 if face_idx == 0:  # Top face
@@ -45,18 +41,72 @@ def visualize_rubiks_cube(cube_config, ax=None):
                     faces.append([[2-j, 3, 2-i], [3-j, 3, 2-i], [3-j, 3, 3-i], [2-j, 3, 3-i]])
                 elif face_idx == 5:  # Bottom face
                     faces.append([[j, i, 0], [j+1, i, 0], [j+1, i+1, 0], [j, i+1, 0]])
-                
-                color_char = face_config[i*3 + j]
-                face_colors.append(color_map[color_char])
+    return faces
 
-    # Clear the existing plot
-    ax.clear()
 
-    # Plot each face
-    for face, color in zip(faces, face_colors):
-        poly3d = [[tuple(vertex) for vertex in face]]
-        ax.add_collection3d(Poly3DCollection(poly3d, facecolors=color, linewidths=1, edgecolors='black', alpha=1))
+STICKER_QUADS = _sticker_quads()
+_QUADS = np.array(STICKER_QUADS, dtype=np.float64)
+_CENTROIDS = _QUADS.mean(axis=1)
+
+# Slab of the cube turned by each move letter: (axis, low, high) in quad coordinates
+_LAYERS = {
+    'U': (2, 2, 3), 'D': (2, 0, 1), 'E': (2, 1, 2), 'Y': (2, 0, 3),
+    'L': (0, 0, 1), 'R': (0, 2, 3), 'M': (0, 1, 2), 'X': (0, 0, 3),
+    'F': (1, 0, 1), 'B': (1, 2, 3), 'S': (1, 1, 2), 'Z': (1, 0, 3),
+}
+
+# matplotlib's RGB values of the COLOR_MAP names
+COLOR_RGB = {
+    'w': (255, 255, 255),
+    'y': (255, 255, 0),
+    'r': (255, 0, 0),
+    'o': (255, 165, 0),
+    'g': (0, 128, 0),
+    'b': (0, 0, 255),
+}
+_RGBA = {c: tuple(v / 255 for v in rgb) + (1.0,) for c, rgb in COLOR_RGB.items()}
+
+
+def _rotation(axis, degrees):
+    theta = np.radians(degrees)
+    a, b = [k for k in range(3) if k != axis]
+    matrix = np.eye(3)
+    matrix[a, a] = matrix[b, b] = np.cos(theta)
+    matrix[a, b], matrix[b, a] = -np.sin(theta), np.sin(theta)
+    return matrix
+
+
+def _rotate(quads, axis, degrees):
+    return (quads - 1.5) @ _rotation(axis, degrees).T + 1.5
 
+
+def layer_turn(move):
+    """
+    (sticker indices, axis, degrees) that animate a move: rotating those
+    stickers' quads by degrees about the axis (0 x, 1 y, 2 z) through the
+    cube's center carries the state before the move onto the state after it
+    """
+    return _layer_turn(str(move).upper())
+
+
+@lru_cache(maxsize=None)
+def _layer_turn(name):
+    import cube_state
+    axis, low, high = _LAYERS[name[0]]
+    indices = np.nonzero((_CENTROIDS[:, axis] >= low) & (_CENTROIDS[:, axis] <= high))[0]
+    perm = cube_state.PERMS[cube_state.move_code(name)]
+    # The turn direction is whichever rotation agrees with cube_state's
+    # permutation, so the animation always lands on the next state
+    for degrees in ((180,) if name.endswith('2') else (90, -90)):
+        moved = _rotate(_CENTROIDS[indices], axis, degrees)
+        distances = np.linalg.norm(_CENTROIDS[None] - moved[:, None], axis=2)
+        targets = distances.argmin(axis=1)
+        if np.allclose(distances.min(axis=1), 0) and (perm[targets] == indices).all():
+            return indices, axis, degrees
+    raise ValueError(f"No layer rotation matches move {name}")
+
+
+def _setup_axes(ax):
     # Set the aspect ratio to be equal
     ax.set_box_aspect([3, 3, 3])
 
@@ -68,14 +118,199 @@ def visualize_rubiks_cube(cube_config, ax=None):
     ax.set_ylim([0, 3])
     ax.set_zlim([0, 3])
 
-    if ax is None:
+
+def visualize_rubiks_cube(cube_config, ax=None):
+    if len(cube_config) != 54:
+        raise ValueError("The cube configuration must be exactly 54 characters long.")
+
+    show = ax is None
+    if show:
+        import matplotlib.pyplot as plt
+        fig = plt.figure()
+        ax = fig.add_subplot(111, projection='3d')
+
+    from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+    faces = STICKER_QUADS
+    face_colors = [COLOR_MAP[color_char] for color_char in cube_config]
+
+    # Clear the existing plot
+    ax.clear()
+
+    # Plot each face
+    for face, color in zip(faces, face_colors):
+        poly3d = [[tuple(vertex) for vertex in face]]
+        ax.add_collection3d(Poly3DCollection(poly3d, facecolors=color, linewidths=1, edgecolors='black', alpha=1))
+
+    _setup_axes(ax)
+
+    if show:
         plt.show()
 
-def main(cube_config='wowgybwyogygybyoggrowbrgywrborwggybrbwororbwborgowryby'):
+
+class CubeRenderer:
+    """
+    Retained-mode cube renderer.
+
+    The 54 sticker quads are built once as a single Poly3DCollection;
+    update() only rewrites the facecolors of stickers that changed and
+    leaves the scene graph alone.
+    """
+    def __init__(self, ax, cube_config=None):
+        from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+        self.ax = ax
+        ax.clear()
+        self.facecolors = np.ones((54, 4))
+        self.collection = Poly3DCollection(STICKER_QUADS, facecolors=self.facecolors, linewidths=1, edgecolors='black', alpha=1)
+        ax.add_collection3d(self.collection)
+        _setup_axes(ax)
+        self.cube_config = None
+        self.turned = False
+        if cube_config is not None:
+            self.update(cube_config)
+
+    def update(self, cube_config):
+        """Recolor the stickers that differ from the last state, returns the number changed"""
+        if len(cube_config) != 54:
+            raise ValueError("The cube configuration must be exactly 54 characters long.")
+        if self.cube_config is None:
+            changed = range(54)
+        else:
+            changed = [i for i, (old, new) in enumerate(zip(self.cube_config, cube_config)) if old != new]
+        for i in changed:
+            self.facecolors[i] = _RGBA[cube_config[i]]
+        if changed:
+            self.collection.set_facecolor(self.facecolors)
+        self.cube_config = cube_config
+        if self.turned:
+            self.collection.set_verts(STICKER_QUADS)
+            self.turned = False
+        return len(changed)
+
+    def turn(self, indices, axis, degrees):
+        """Draw the stickers at indices rotated part way through a layer turn, see layer_turn()"""
+        verts = _QUADS.copy()
+        verts[indices] = _rotate(_QUADS[indices], axis, degrees)
+        self.collection.set_verts(verts)
+        self.turned = True
+
+    def draw(self):
+        self.ax.figure.canvas.draw_idle()
+
+
+# Unfolded net, in sticker cells:      U
+#                                    L F R B
+#                                      D
+NET_ORIGINS = [(3, 0), (0, 3), (3, 3), (6, 3), (9, 3), (3, 6)]
+NET_SIZE = (12, 9)
+_NET_COLORS = 'ybrgow'  # cube_state.COLORS, the color codes of state arrays
+_NET_BACKGROUND = (40, 40, 40)
+_NET_PALETTE = np.array([COLOR_RGB[c] for c in _NET_COLORS] + [_NET_BACKGROUND], dtype=np.uint8)
+_NET_LUT = np.full(256, 255, dtype=np.uint8)
+for _i, _c in enumerate(_NET_COLORS):
+    _NET_LUT[ord(_c)] = _NET_LUT[ord(_c.upper())] = _i
+
+
+@lru_cache(maxsize=None)
+def net_rects(scale=16, gap=1):
+    """(54, 4) int array of sticker (x, y, width, height) in pixels, in cube_config order"""
+    rects = np.empty((54, 4), dtype=np.int64)
+    for face, (col, row) in enumerate(NET_ORIGINS):
+        for k in range(9):
+            rects[face * 9 + k] = ((col + k % 3) * scale + gap, (row + k // 3) * scale + gap,
+                                   scale - 2 * gap, scale - 2 * gap)
+    rects.flags.writeable = False
+    return rects
+
+
+@lru_cache(maxsize=None)
+def _net_labels(scale, gap):
+    # Sticker index of every pixel, 54 for background and gaps
+    labels = np.full((NET_SIZE[1] * scale, NET_SIZE[0] * scale), 54, dtype=np.intp)
+    for i, (x, y, w, h) in enumerate(net_rects(scale, gap)):
+        labels[y:y + h, x:x + w] = i
+    return labels
+
+
+def _net_states(cube_configs):
+    # Strings or an (N, 54) array of color codes -> (N, 55) codes, the last
+    # column pointing at the background color
+    if isinstance(cube_configs, np.ndarray):
+        states = np.asarray(cube_configs, dtype=np.uint8).reshape(-1, 54)
+    else:
+        states = np.empty((len(cube_configs), 54), dtype=np.uint8)
+        for row, cube_config in enumerate(cube_configs):
+            if len(cube_config) != 54:
+                raise ValueError("The cube configuration must be exactly 54 characters long.")
+            states[row] = _NET_LUT[np.frombuffer(cube_config.encode('ascii'), dtype=np.uint8)]
+    if (states >= len(_NET_COLORS)).any():
+        raise ValueError(f"Cube colors must be one of {', '.join(_NET_COLORS)}")
+    return np.hstack([states, np.full((len(states), 1), len(_NET_COLORS), dtype=np.uint8)])
+
+
+def render_nets(cube_configs, scale=16, gap=1):
+    """
+    Render many states as unfolded nets in one gather
+    Args:
+        cube_configs: 54-char strings, or an (N, 54) cube_state array
+        scale: Pixels per sticker cell
+        gap: Background pixels around each sticker
+    Returns:
+        (N, 9 * scale, 12 * scale, 3) uint8 RGB array
+    """
+    states = _net_states(cube_configs)
+    labels = _net_labels(scale, gap)
+    return _NET_PALETTE[states[:, labels]]
+
+
+def render_net(cube_config, scale=16, gap=1):
+    """Unfolded net of one state as a (9 * scale, 12 * scale, 3) uint8 RGB array"""
+    return render_nets([cube_config] if isinstance(cube_config, str) else cube_config, scale, gap)[0]
+
+
+_SVG_FILLS = ['#%02x%02x%02x' % tuple(rgb) for rgb in _NET_PALETTE]
+
+
+@lru_cache(maxsize=None)
+def _svg_parts(scale, gap):
+    # Everything but the fill colors, which are spliced in per state
+    width, height = NET_SIZE[0] * scale, NET_SIZE[1] * scale
+    head = (f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+            f'viewBox="0 0 {width} {height}"><rect width="100%" height="100%" fill="rgb{_NET_BACKGROUND}"/>')
+    rects = [f'<rect x="{x}" y="{y}" width="{w}" height="{h}" fill="' for x, y, w, h in net_rects(scale, gap)]
+    return head, rects
+
+
+
+def net_svgs(cube_configs, scale=20, gap=1):
+    """Unfolded nets of many states as SVG strings"""
+    head, rects = _svg_parts(scale, gap)
+    svgs = []
+    for state in _net_states(cube_configs):
+        svgs.append(head + ''.join(rect + _SVG_FILLS[code] + '"/>' for rect, code in zip(rects, state)) + '</svg>')
+    return svgs
+
+
+def net_svg(cube_config, scale=20, gap=1):
+    """Unfolded net of one state as an SVG string"""
+    return net_svgs([cube_config] if isinstance(cube_config, str) else cube_config, scale, gap)[0]
+
+
+def main(cube_config='wowgybwyogygybyoggrowbrgywrborwggybrbwororbwborgowryby', net=None):
+    """Show the 3D view, or write the unfolded net to an .svg or .png file given by net"""
+    if net is not None:
+        if net.endswith('.svg'):
+            with open(net, 'w') as f:
+                f.write(net_svg(cube_config))
+        else:
+            from PIL import Image
+            Image.fromarray(render_net(cube_config)).save(net)
+        return
+    import matplotlib.pyplot as plt
     fig = plt.figure()
     ax = fig.add_subplot(111, projection='3d')
     visualize_rubiks_cube(cube_config, ax)
     plt.show()
 
 if __name__ == '__main__':
+    import fire
     fire.Fire(main)
\ No newline at end of file
@@ -0,0 +1,213 @@
+"""
+Headless export of solution walkthroughs as PNG frames, GIF or MP4.
+
+Every cube gets one frame for its starting state and one per move, with the
+stage name and move drawn above the cube. Rendering uses the Agg canvas
+directly (no pyplot, no display) with one CubeRenderer per worker process,
+so a frame only recolors the stickers its move changed. Each worker renders
+whole walkthroughs and streams frames to disk as they are drawn: PNGs are
+written one by one, GIF/MP4 frames are piped to ffmpeg. Without ffmpeg,
+GIFs fall back to Pillow, which keeps one walkthrough's palette frames in
+memory until it is written.
+
+    python walkthrough_export.py results.jsonl out/ --format gif --workers 8
+"""
+import os
+import sys
+import json
+import shutil
+import subprocess
+import functools
+import numpy as np
+import fire
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import cube_state
+from visualize import CubeRenderer
+from process_pool import bounded_map
+
+FORMATS = ('png', 'gif', 'mp4')
+
+# Per-process (size, dpi, figure, renderer, title), reused across walkthroughs
+_canvas = None
+
+
+def walkthrough_frames(cube, moves, step_names):
+    """Yield (cube string, stage name, move) for the start and after each move"""
+    state = cube_state.from_string(cube)
+    yield cube_state.to_string(state), 'Start', ''
+    for move, stage in zip(moves, step_names):
+        state = cube_state.apply_move(state, move)
+        yield cube_state.to_string(state), stage, str(move)
+
+
+def _get_canvas(size, dpi):
+    global _canvas
+    if _canvas is None or _canvas[:2] != (size, dpi):
+        fig = Figure(figsize=(size, size), dpi=dpi)
+        FigureCanvasAgg(fig)
+        ax = fig.add_axes([0, 0, 1, 0.9], projection='3d')
+        title = fig.text(0.5, 0.95, '', ha='center', va='center', fontsize=12)
+        _canvas = (size, dpi, fig, CubeRenderer(ax), title)
+    return _canvas[2:]
+
+
+def render_frames(cube, moves, step_names, size=4, dpi=100):
+    """Yield each walkthrough frame as an (H, W, 3) uint8 array"""
+    fig, renderer, title = _get_canvas(size, dpi)
+    total = len(moves)
+    for index, (cube_config, stage, move) in enumerate(walkthrough_frames(cube, moves, step_names)):
+        renderer.update(cube_config)
+        title.set_text(f"{stage}  {move}  ({index}/{total})" if move else f"{stage}  (0/{total})")
+        fig.canvas.draw()
+        yield np.asarray(fig.canvas.buffer_rgba())[:, :, :3]
+
+
+def _ffmpeg_command(path, fmt, width, height, fps):
+    command = ['ffmpeg', '-y', '-loglevel', 'error', '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+               '-s', f'{width}x{height}', '-r', str(fps), '-i', '-']
+    if fmt == 'gif':
+        command += ['-vf', 'split[a][b];[a]palettegen[p];[b][p]paletteuse']
+    else:
+        # yuv420p needs even dimensions
+        command += ['-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-pix_fmt', 'yuv420p', '-c:v', 'libx264']
+    return command + [path]
+
+
+def _write_ffmpeg(frames, path, fmt, fps):
+    process = None
+    try:
+        for frame in frames:
+            if process is None:
+                height, width = frame.shape[:2]
+                process = subprocess.Popen(_ffmpeg_command(path, fmt, width, height, fps),
+                                           stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+            process.stdin.write(np.ascontiguousarray(frame).tobytes())
+    finally:
+        if process is not None:
+            process.stdin.close()
+            error = process.stderr.read()
+            if process.wait() != 0:
+                raise RuntimeError(f"ffmpeg failed for {path}: {error.decode(errors='replace').strip()}")
+
+
+def _write_pillow_gif(frames, path, fps):
+    from PIL import Image
+    # Quantize as frames arrive so only palette images are held. The stickers
+    # are flat colors, so the first frame's palette fits every frame and
+    # reusing it without dithering is much cheaper than quantizing each one
+    images = []
+    for frame in frames:
+        image = Image.fromarray(frame)
+        if images:
+            image = image.quantize(palette=images[0], dither=Image.Dither.NONE)
+        else:
+            image = image.quantize(colors=64)
+        images.append(image)
+    images[0].save(path, save_all=True, append_images=images[1:], duration=int(1000 / fps), loop=0)
+
+
+def _write_pngs(frames, directory):
+    from PIL import Image
+    os.makedirs(directory, exist_ok=True)
+    count = 0
+    for count, frame in enumerate(frames, 1):
+        Image.fromarray(frame).save(os.path.join(directory, f'frame_{count - 1:04d}.png'))
+    return count
+
+
+def export_walkthrough(cube, moves, step_names, path, fmt='gif', fps=4, size=4, dpi=100):
+    """
+    Render one walkthrough to path: a directory of numbered PNGs, a GIF or an MP4
+    Returns:
+        Number of frames written
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Format must be one of {', '.join(FORMATS)}")
+    frames = render_frames(cube, moves, step_names, size, dpi)
+    if fmt == 'png':
+        return _write_pngs(frames, path)
+    if shutil.which('ffmpeg'):
+        _write_ffmpeg(frames, path, fmt, fps)
+    elif fmt == 'gif':
+        _write_pillow_gif(frames, path, fps)
+    else:
+        raise RuntimeError("MP4 export needs ffmpeg on the PATH")
+    return len(moves) + 1
+
+
+def _export_one(item, out_dir, fmt, fps, size, dpi):
+    # Errors are isolated per item, like batch_solve
+    index = item['index']
+    name = f'cube_{index:05d}' + ('' if fmt == 'png' else f'.{fmt}')
+    path = os.path.join(out_dir, name)
+    try:
+        if 'moves' not in item:
+            from rubiks_tutor import solve
+            moves, step_names = solve(item['cube'])
+            item = dict(item, moves=[str(m) for m in moves], steps=step_names)
+        frames = export_walkthrough(item['cube'], item['moves'], item['steps'], path, fmt, fps, size, dpi)
+        return {'index': index, 'cube': item['cube'], 'path': path, 'frames': frames}
+    except Exception as e:
+        return {'index': index, 'cube': item['cube'], 'error': f"{type(e).__name__}: {e}"}
+
+
+def read_items(stream):
+    """
+    Yield walkthrough items from batch_solve JSON lines or plain cube strings
+    (solved in the worker); failed batch results and # comments are skipped
+    """
+    index = 0
+    for line in stream:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if line.startswith('{'):
+            item = json.loads(line)
+            if 'error' in item:
+                continue
+            item.setdefault('index', index)
+        else:
+            item = {'index': index, 'cube': line}
+        index += 1
+        yield item
+
+
+def export_batch(items, out_dir, fmt='gif', workers=None, fps=4, size=4, dpi=100):
+    """
+    Export walkthroughs across a process pool, yielding one result dict per
+    item as it completes ('path' and 'frames', or 'error')
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Format must be one of {', '.join(FORMATS)}")
+    os.makedirs(out_dir, exist_ok=True)
+    if workers == 1:
+        for item in items:
+            yield _export_one(item, out_dir, fmt, fps, size, dpi)
+        return
+
+    # Small window: each walkthrough is a lot of rendering already
+    task = functools.partial(_export_one, out_dir=out_dir, fmt=fmt, fps=fps, size=size, dpi=dpi)
+    yield from bounded_map(task, items, workers, window=2, ordered=False)
+
+def main(input='-', out_dir='walkthroughs', format='gif', workers=None, fps=4, size=4, dpi=100):
+    """
+    Export a walkthrough per cube from batch_solve.py output or cube strings
+    (a file, or stdin with '-'), printing one JSON result per line
+    """
+    in_stream = sys.stdin if input == '-' else open(input)
+    failed = 0
+    try:
+        for result in export_batch(read_items(in_stream), out_dir, format, workers, fps, size, dpi):
+            if 'error' in result:
+                failed += 1
+            print(json.dumps(result), flush=True)
+    finally:
+        if in_stream is not sys.stdin:
+            in_stream.close()
+    if failed:
+        print(f"{failed} walkthrough(s) failed", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    fire.Fire(main)